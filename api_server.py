@@ -1,52 +1,88 @@
 # Api Server
 import os
+import asyncio
 import glob
+import queue
+import functools
+import hashlib
+import threading
 import duckdb
+import orjson
 import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import MappingProxyType
 from typing import Any, Dict, Optional
-from fastapi import FastAPI
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
 from fastapi import Query as FQuery
 from router import route
-from resolver import match_summary, player_stats, team_squad, player_vs_team, head_to_head, best_phase_bowlers
+from resolver import Resolver, match_summary, player_stats, team_squad, player_vs_team, head_to_head, best_phase_bowlers
 from formatters import format_answer
+from query import fetch_records, submit_query
 
 
 
 # DuckDB auto-detection 
-def sanitize_for_json(obj):
+def _clean_float(x):
+    return None if (math.isnan(x) or math.isinf(x)) else x
+
+def _clean_dict(d):
+    return {k: sanitize_for_json(v) for k, v in d.items()}
+
+def _clean_list(xs):
+    return [sanitize_for_json(x) for x in xs]
+
+def _keep(x):
+    return x
+
+def _clean_other(obj):
+    """Subclasses (numpy.float64, OrderedDict, ...) fall back to isinstance checks."""
     if isinstance(obj, float):
-        return None if (math.isnan(obj) or math.isinf(obj)) else obj
+        return _clean_float(obj)
     if isinstance(obj, dict):
-        return {k: sanitize_for_json(v) for k, v in obj.items()}
+        return _clean_dict(obj)
     if isinstance(obj, list):
-        return [sanitize_for_json(x) for x in obj]
+        return _clean_list(obj)
     return obj
 
+# Exact-type dispatch: one dict lookup per node instead of an isinstance chain
+_SANITIZE = {float: _clean_float, dict: _clean_dict, list: _clean_list,
+             str: _keep, int: _keep, bool: _keep, type(None): _keep}
+
+def sanitize_for_json(obj):
+    """Recursive NaN/inf -> None fallback for dict/list payloads."""
+    return _SANITIZE.get(type(obj), _clean_other)(obj)
+
+# Raw tables plus the derived lookup tables built by ingest.py
+REQUIRED_TABLES = (
+    "matches_meta", "deliveries", "season_teams", "player_names",
+    "mv_player_season_batting", "mv_player_season_bowling", "mv_player_team_season",
+    "mv_h2h_season", "mv_phase_bowler_season", "mv_match_batting", "mv_match_bowling",
+)
+
+@functools.lru_cache(maxsize=8)
 def looks_like_valid_db(path: str):
-    """Open DuckDB and check required tables + non-zero rows."""
+    """Open DuckDB and check required tables, the deliveries.is_legal column + non-zero rows."""
     if not os.path.exists(path):
         return False
     try:
-        con = duckdb.connect(path)
-        have_meta = con.execute("""
-            SELECT 1
-            FROM information_schema.tables
-            WHERE table_name = 'matches_meta'
-        """).fetchone()
-        have_delv = con.execute("""
-            SELECT 1
-            FROM information_schema.tables
-            WHERE table_name = 'deliveries'
-        """).fetchone()
-        if not (have_meta and have_delv):
-            con.close()
-            return False
-
-        cnt_meta = con.execute("SELECT COUNT(*) FROM matches_meta").fetchone()[0]
-        cnt_delv = con.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
+        con = duckdb.connect(path, read_only=True)
+        # One roundtrip: no row means a required table is missing (a missing base table fails to bind -> except)
+        row = con.execute(f"""
+            SELECT (SELECT COUNT(*) FROM matches_meta), (SELECT COUNT(*) FROM deliveries)
+            WHERE (SELECT COUNT(DISTINCT table_name)
+                   FROM information_schema.tables
+                   WHERE table_name IN ({",".join("?" * len(REQUIRED_TABLES))})) = ?
+              AND EXISTS (SELECT 1 FROM information_schema.columns
+                          WHERE table_name = 'deliveries' AND column_name = 'is_legal')
+        """, list(REQUIRED_TABLES) + [len(REQUIRED_TABLES)]).fetchone()
         con.close()
+        if row is None:
+            return False
+        cnt_meta, cnt_delv = row
         return (cnt_meta or 0) > 0 and (cnt_delv or 0) > 0
     except Exception:
         return False
@@ -98,77 +134,181 @@ def auto_find_db():
         "  • Make sure you've run ingest.py to create/populate ipl_data.duckdb\n"
         "  • Or set IPL_DB to the absolute path of your DuckDB file\n"
         "  • Run:  python ingest.py --db ipl_data.duckdb --folder C:\\path\\to\\cricsheet\n"
+        "  • Older databases: run  python ingest.py --db ipl_data.duckdb  once to build the derived lookup tables\n"
+        "    and backfill deliveries.is_legal (the server opens the DB read-only, so it can't do this itself)\n"
     )
 
 
 DB_PATH = auto_find_db()  
 
+# One shared read-only connection (no write lock, so several uvicorn workers can map the same file);
+# requests borrow cheap sibling cursors from a small pool. Threads/memory can be overridden via env.
+DB_CONFIG = {
+    "threads": int(os.environ.get("IPL_DB_THREADS") or os.cpu_count() or 1),
+    "memory_limit": os.environ.get("IPL_DB_MEMORY_LIMIT", "2GB"),
+    "enable_object_cache": True,
+}
+CON = duckdb.connect(DB_PATH, read_only=True, config=DB_CONFIG)
+CON.execute("SET enable_progress_bar = false")
+DB_THREADS = int(CON.execute("SELECT current_setting('threads')").fetchone()[0])
+_CURSORS: queue.LifoQueue = queue.LifoQueue(maxsize=DB_THREADS)
+
+@contextmanager
+def db_cursor():
+    """Borrow a cursor on the shared connection and hand it back to the pool afterwards."""
+    try:
+        cur = _CURSORS.get_nowait()
+    except queue.Empty:
+        cur = CON.cursor()
+    try:
+        yield cur
+    finally:
+        try:
+            _CURSORS.put_nowait(cur)
+        except queue.Full:
+            cur.close()
+
+# Team/player name index, loaded once; it is only read after construction so requests can share it
+RESOLVER = Resolver(CON)
+
+# Bounded pool for fanning out independent sub-queries; kept small so it doesn't oversubscribe DuckDB's own threads
+EXECUTOR = ThreadPoolExecutor(max_workers=min(8, DB_THREADS), thread_name_prefix="duckdb")
+
 
 # FastAPI app 
 
-app = FastAPI(title="Cricket Insight Agent", version="0.2")
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (numpy scalars/arrays serialized natively, NaN -> null)."""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+app = FastAPI(title="Cricket Insight Agent", version="0.2", default_response_class=ORJSONResponse)
+
+# CORS - Allow browser calls during dev. In production (ENV=prod) only the origins listed in
+# CORS_ORIGINS (comma-separated) with explicit methods/headers; no list means no CORS middleware at all.
+if os.getenv("ENV", "").lower() in ("prod", "production"):
+    CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
+    if CORS_ORIGINS:
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=CORS_ORIGINS,
+            allow_credentials=True,
+            allow_methods=("GET", "POST"),
+            allow_headers=("Content-Type",),
+        )
+else:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+@functools.lru_cache(maxsize=4096)
+def _route_cached(q: str):
+    """route() memoized on whitespace-normalized text; results are read-only views so cached entries can't be mutated."""
+    parsed = route(q)
+    return MappingProxyType({**parsed, "params": MappingProxyType(parsed.get("params", {}))})
+
+
+# /ask result cache: (intent, params) -> (ok, sanitized result, answer_text).
+# The DB is static read-only IPL data, so entries never go stale; plain LRU bound, no TTL.
+RESULT_CACHE_MAX = 1024
+_RESULTS: "OrderedDict[tuple, tuple]" = OrderedDict()
+_RESULTS_LOCK = threading.Lock()
+
+
+def _cached_result(key):
+    """Return the cached (ok, result, answer_text) for key, or None."""
+    with _RESULTS_LOCK:
+        hit = _RESULTS.get(key)
+        if hit is not None:
+            _RESULTS.move_to_end(key)
+        return hit
 
-# CORS - Allow browser calls during dev
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-class AskIn(BaseModel):
-    query: str
+def _store_result(key, entry):
+    """Insert entry into the result cache, evicting the least recently used one past the bound."""
+    with _RESULTS_LOCK:
+        _RESULTS[key] = entry
+        if len(_RESULTS) > RESULT_CACHE_MAX:
+            _RESULTS.popitem(last=False)
 
 
-def run_intent(intent: str, params: Dict[str, Any]) -> Dict[str, Any]:
+def run_intent(con, intent: str, params: Dict[str, Any]) -> Dict[str, Any]:
     """Run Function based on prompts""" 
     if intent == "match_summary":
         season = params.get("season")
         nth = params.get("nth", 1)
         if not season:
             return {"error": "Please specify a season, e.g. 'in 2011'."}
-        return match_summary(DB_PATH, params["team_a"], params["team_b"], season, nth)
+        return match_summary(con, params["team_a"], params["team_b"], season, nth, executor=EXECUTOR, res=RESOLVER)
 
     if intent == "player_stats":
         scope = params.get("scope", "career")
-        return player_stats(DB_PATH, params["player"], scope=scope, season=params.get("season"))
+        return player_stats(con, params["player"], scope=scope, season=params.get("season"), executor=EXECUTOR, res=RESOLVER)
 
     if intent == "team_squad":
-        return team_squad(DB_PATH, params["team"], params["season"])
+        return team_squad(con, params["team"], params["season"], res=RESOLVER)
 
     if intent == "player_vs_team":
         scope = params.get("scope", "career")
-        return player_vs_team(DB_PATH, params["player"], params["opponent"], scope=scope, season=params.get("season"))
+        return player_vs_team(con, params["player"], params["opponent"], scope=scope, season=params.get("season"), res=RESOLVER)
 
     if intent == "head_to_head":
         scope = params.get("scope", "career")
-        return head_to_head(DB_PATH, params["team_a"], params["team_b"], scope=scope, season=params.get("season"))
+        return head_to_head(con, params["team_a"], params["team_b"], scope=scope, season=params.get("season"), executor=EXECUTOR, res=RESOLVER)
     if intent == "best_phase_bowler":
         phase  = params.get("phase")
         scope  = params.get("scope", "career")
         season = params.get("season")
         min_overs = 10 if scope == "season" else 30
-        return best_phase_bowlers(DB_PATH, phase, scope=scope, season=season, min_overs=min_overs)
+        return best_phase_bowlers(con, phase, scope=scope, season=season, min_overs=min_overs)
     
     return {"error": "Unknown intent"}
 
 
 @app.on_event("startup")
 def _verify_db_on_start():
-    # Fail if the DB isn't valid
+    # Fail if the DB isn't valid (cache hit: auto_find_db() already validated this path)
     if not looks_like_valid_db(DB_PATH):
         raise RuntimeError(
-            f"DuckDB at {DB_PATH} is missing required tables or has zero rows."
+            f"DuckDB at {DB_PATH} is missing required tables/columns or has zero rows."
         )
 
 
+# /health is polled by load balancers: serve a cached status, re-stat the DB file once a minute in the background
+HEALTH_REFRESH_SECS = 60
+_HEALTH = {"status": "ok", "db_path": DB_PATH, "db_exists": True}
+
+def _stat_health():
+    exists = os.path.exists(DB_PATH)
+    return {"status": "ok" if exists else "warn", "db_path": DB_PATH, "db_exists": exists}
+
+async def _refresh_health():
+    global _HEALTH
+    while True:
+        await asyncio.sleep(HEALTH_REFRESH_SECS)
+        _HEALTH = _stat_health()
+
+
+@app.on_event("startup")
+async def _start_health_refresh():
+    global _HEALTH
+    _HEALTH = _stat_health()
+    app.state.health_task = asyncio.create_task(_refresh_health())
+
+
+@app.on_event("shutdown")
+async def _stop_health_refresh():
+    app.state.health_task.cancel()
+
+
 @app.get("/health")
-def health():
+async def health():
     """Display status of the API"""
-    exists = os.path.exists(DB_PATH)
-    status = "ok" if exists else "warn"
-    return {"status": status, "db_path": DB_PATH, "db_exists": exists}
+    return _HEALTH
 
 
 @app.get("/dbinfo")
@@ -178,24 +318,28 @@ def dbinfo():
     if not info["db_exists"]:
         return info
     try:
-        con = duckdb.connect(DB_PATH)
-        cnt_meta = con.execute("SELECT COUNT(*) FROM matches_meta").fetchone()[0]
-        cnt_delv = con.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
-        # DIsplay some seasons & teams head for verification
-        seasons = con.execute("""
-            SELECT season, COUNT(*) AS matches
-            FROM matches_meta
-            GROUP BY season
-            ORDER BY season
-            LIMIT 10
-        """).df().to_dict("records")
-        sample = con.execute("""
-            SELECT match_id, season, team1, team2, date, winner
-            FROM matches_meta
-            ORDER BY date NULLS LAST, match_id
-            LIMIT 5
-        """).df().to_dict("records")
-        con.close()
+        # Four independent statements: run them concurrently, each on its own cursor
+        with db_cursor() as con:
+            cnt_meta_job = submit_query(con, EXECUTOR, "SELECT COUNT(*) FROM matches_meta", fetch="fetchone")
+            cnt_delv_job = submit_query(con, EXECUTOR, "SELECT COUNT(*) FROM deliveries", fetch="fetchone")
+            # DIsplay some seasons & teams head for verification
+            seasons_job = submit_query(con, EXECUTOR, """
+                SELECT season, COUNT(*) AS matches
+                FROM matches_meta
+                GROUP BY season
+                ORDER BY season
+                LIMIT 10
+            """, fetch="to_arrow_table")
+            sample_job = submit_query(con, EXECUTOR, """
+                SELECT match_id, season, team1, team2, date, winner
+                FROM matches_meta
+                ORDER BY date NULLS LAST, match_id
+                LIMIT 5
+            """, fetch="to_arrow_table")
+            cnt_meta = cnt_meta_job.result()[0]
+            cnt_delv = cnt_delv_job.result()[0]
+            seasons = seasons_job.result().to_pylist()
+            sample = sample_job.result().to_pylist()
         info.update({
             "matches_meta_rows": int(cnt_meta),
             "deliveries_rows": int(cnt_delv),
@@ -214,42 +358,33 @@ def debug_h2h(team_a: str = FQuery(...), team_b: str = FQuery(...), season: str
     Show the exact matches_meta rows the server sees for (team_a, team_b, season).
     Use exact team names or short aliases .
     """
-    import duckdb
-    from resolver import Resolver
-
-    # Normalize
-    res = Resolver(DB_PATH)
-    A = res.resolve_team(team_a) or team_a
-    B = res.resolve_team(team_b) or team_b
-
-    con = duckdb.connect(DB_PATH)
-    df = con.execute("""
-        SELECT match_id, season, date, team1, team2, winner, venue
-        FROM matches_meta
-        WHERE season = ?
-          AND (
-                (team1 = ? AND team2 = ?) OR
-                (team1 = ? AND team2 = ?)
-              )
-        ORDER BY date NULLS LAST, match_id
-    """, [season, A, B, B, A]).df()
-
-    #  Distinct Team names in the season
-    teams = con.execute("""
-        WITH t AS (
-          SELECT team1 AS team FROM matches_meta WHERE season = ?
-          UNION ALL
-          SELECT team2 AS team FROM matches_meta WHERE season = ?
-        )
-        SELECT DISTINCT team FROM t ORDER BY team
-    """, [season, season]).df()["team"].tolist()
+    with db_cursor() as con:
+        # Normalize
+        A = RESOLVER.resolve_team(team_a) or team_a
+        B = RESOLVER.resolve_team(team_b) or team_b
+
+        rows = fetch_records(con.execute("""
+            SELECT match_id, season, date, team1, team2, winner, venue
+            FROM matches_meta
+            WHERE season = ?
+              AND (
+                    (team1 = ? AND team2 = ?) OR
+                    (team1 = ? AND team2 = ?)
+                  )
+            ORDER BY date NULLS LAST, match_id
+        """, [season, A, B, B, A]))
+
+        #  Distinct Team names in the season (pre-aggregated at ingest)
+        teams = con.execute("""
+            SELECT team FROM season_teams WHERE season = ? ORDER BY team
+        """, [season]).to_arrow_table().column("team").to_pylist()
 
     return {
         "input": {"team_a": team_a, "team_b": team_b, "season": season},
         "resolved": {"A": A, "B": B},
-        "rows": df.to_dict("records"),
+        "rows": rows,
         "season_teams": teams,
-        "rowcount": int(df.shape[0]),
+        "rowcount": len(rows),
     }
 
 
@@ -258,66 +393,108 @@ def debug_player(name: str = FQuery(...), season: Optional[str] = None):
     """
     See whether the player exists in deliveries as striker or bowler.
     """
-    import duckdb
-    from resolver import Resolver
-
-    res = Resolver(DB_PATH)
-    canonical, choices = res.resolve_player(name)
-
-    con = duckdb.connect(DB_PATH)
-    if season:
-        df = con.execute("""
-           WITH names AS (
-             SELECT DISTINCT striker AS who FROM deliveries WHERE season = ? AND striker ILIKE ?
-             UNION
-             SELECT DISTINCT bowler  AS who FROM deliveries WHERE season = ? AND bowler  ILIKE ?
-           )
-           SELECT who FROM names ORDER BY who
-        """, [season, f"%{name}%", season, f"%{name}%"]).df()
-    else:
-        df = con.execute("""
-           WITH names AS (
-             SELECT DISTINCT striker AS who FROM deliveries WHERE striker ILIKE ?
-             UNION
-             SELECT DISTINCT bowler  AS who FROM deliveries WHERE bowler  ILIKE ?
-           )
-           SELECT who FROM names ORDER BY who
-        """, [f"%{name}%", f"%{name}%"]).df()
+    with db_cursor() as con:
+        canonical, choices = RESOLVER.resolve_player(name)
+
+        # Distinct names are pre-aggregated per season at ingest, so this scans a few thousand rows, not deliveries
+        names = con.execute("""
+            SELECT DISTINCT who
+            FROM player_names
+            WHERE (? IS NULL OR season = ?) AND who ILIKE ?
+            ORDER BY who
+        """, [season or None, season or None, f"%{name}%"]).to_arrow_table().column("who").to_pylist()
 
     return {
         "input": {"name": name, "season": season},
         "resolved": canonical,
         "choices": choices,
-        "examples": df["who"].tolist(),
-        "count": int(df.shape[0]),
+        "examples": names,
+        "count": len(names),
     }
 
 
+# /debug/sql prepared-statement cache: sha256(sql) -> statement name, prepared on one dedicated cursor
+PREPARED_MAX = 64
+_PREPARED: "OrderedDict[str, str]" = OrderedDict()
+_PREPARED_LOCK = threading.Lock()
+_DEBUG_CUR = CON.cursor()
+
+
+def _check_select(sql: str):
+    """Parse sql and return it only if it is exactly one SELECT statement (raises otherwise)."""
+    stmts = duckdb.extract_statements(sql)
+    if len(stmts) != 1 or stmts[0].type != duckdb.StatementType.SELECT:
+        raise ValueError("Only a single SELECT statement is allowed.")
+    return stmts[0].query
+
+
+def _run_prepared(sql: str):
+    """Execute a SELECT via a cached prepared statement so repeated probes skip parse/plan."""
+    key = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+    with _PREPARED_LOCK:
+        name = _PREPARED.get(key)
+        if name is None:
+            name = f"dbg_{key[:16]}"
+            _DEBUG_CUR.execute(f"PREPARE {name} AS {_check_select(sql)}")
+            _PREPARED[key] = name
+            if len(_PREPARED) > PREPARED_MAX:
+                _, old = _PREPARED.popitem(last=False)
+                _DEBUG_CUR.execute(f"DEALLOCATE {old}")
+        else:
+            _PREPARED.move_to_end(key)
+        return fetch_records(_DEBUG_CUR.execute(f"EXECUTE {name}"))
+
+
+def _ndjson_rows(sql: str, batch_rows: int = 10_000):
+    """Yield a query's rows as JSON lines, one Arrow record batch at a time."""
+    with db_cursor() as con:
+        try:
+            reader = con.execute(_check_select(sql)).fetch_record_batch(batch_rows)
+            for batch in reader:
+                yield b"".join(orjson.dumps(r, default=str) + b"\n" for r in batch.to_pylist())
+        except Exception as e:
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+
+
 @app.get("/debug/sql")
-def debug_sql(sql: str = FQuery(...)):
+def debug_sql(sql: str = FQuery(...), stream: bool = False):
     """
     Run a read-only SQL quickly for debugging.Ex:/debug/sql?sql=SELECT%20season,%20COUNT(*)%20FROM%20matches_meta%20GROUP%20BY%201
+    Add &stream=true for large results: rows come back as NDJSON in bounded batches.
+    Only a single SELECT is accepted; anything else is rejected before it runs.
     """
-    import duckdb
-    con = duckdb.connect(DB_PATH)
+    if stream:
+        return StreamingResponse(_ndjson_rows(sql), media_type="application/x-ndjson")
+
     try:
-        df = con.execute(sql).df()
-        return {"rows": df.to_dict("records"), "rowcount": int(df.shape[0])}
+        rows = _run_prepared(sql)
+        return {"rows": rows, "rowcount": len(rows)}
     except Exception as e:
         return {"error": str(e)}
 
 @app.post("/ask")
-def ask(body: AskIn):
-    """ Prompt"""
-    parsed = route(body.query)
+def ask(body: Dict[str, Any] = Body(...)):
+    """ Prompt. Body: {"query": "<question>"} (checked by hand; a one-field model isn't worth a validator)"""
+    query = body.get("query")
+    if not isinstance(query, str):
+        raise HTTPException(status_code=422, detail="Body must be a JSON object with a string 'query' field.")
+    parsed = _route_cached(" ".join(query.split()))
     print("[ASK] parsed:", parsed)
     intent = parsed["intent"]
     if intent == "unknown":
-        return {"ok": False, "intent": intent, "query": body.query, "hint": parsed.get("hint")}
-
-    result = run_intent(intent, parsed["params"])
-    ok = "error" not in result
-    answer_text = format_answer(intent, result)
-    result = sanitize_for_json(result)          
-    return {"ok": ok, "intent": intent, "query": body.query,
+        return {"ok": False, "intent": intent, "query": query, "hint": parsed.get("hint")}
+
+    key = (intent, tuple(sorted(parsed["params"].items())))
+    entry = _cached_result(key)
+    if entry is None:
+        with db_cursor() as cur:
+            result = run_intent(cur, intent, parsed["params"])
+        ok = "error" not in result
+        # Render the answer on the worker pool while this thread scrubs the payload; both only read result
+        answer_job = EXECUTOR.submit(format_answer, intent, result)
+        clean = sanitize_for_json(result)
+        entry = (ok, clean, answer_job.result())
+        _store_result(key, entry)
+    ok, result, answer_text = entry
+    return {"ok": ok, "intent": intent, "query": query,
             "result": result, "answer_text": answer_text}
\ No newline at end of file
@@ -22,6 +22,25 @@ def header(title: str):
     bar = "-" * len(title)
     return f"{title}\n{bar}"
 
+# Fixed section headers, rendered once at import instead of on every answer
+_HDR_INNINGS = header("Innings Summary")
+_HDR_TOP_BATTERS = header("Top Batters")
+_HDR_TOP_BOWLERS = header("Top Bowlers")
+_HDR_DID_YOU_MEAN = header("Did you mean?")
+_HDR_BATTING = header("Batting")
+_HDR_BATTING_MATCHUPS = header("Batting Matchups")
+_HDR_BOWLING = header("Bowling")
+_HDR_BOWLING_MATCHUPS = header("Bowling Matchups")
+_HDR_TEAMS = header("Teams")
+_HDR_BAT_VS = header("Batting vs Opponent")
+_HDR_BOWL_VS = header("Bowling vs Opponent")
+_HDR_H2H = header("Head-to-Head")
+_HDR_STARS = header("Star Performers")
+
+# Per-row bullet templates (%-formatting: one C-level pass per row)
+_ROW_TOP_BATTER = "  * Inns %s: %s - %s (%s) 4x%s 6x%s SR %s"
+_ROW_TOP_BOWLER = "  * Inns %s: %s - %s/%s in %s (Econ %s)"
+
 def meta_teams(meta: Dict[str, Any]):
     """Extract (team1, team2) from meta['teams'] or team1/team2 keys."""
     if isinstance(meta, dict):
@@ -52,7 +71,7 @@ def format_match_summary(payload: Dict[str, Any]):
     inn = payload.get("innings", [])
     if isinstance(inn, list) and inn:
         lines.append("")
-        lines.append(header("Innings Summary"))
+        lines.append(_HDR_INNINGS)
         for i in inn:
             bt = s(i.get("batting_team"))
             runs = nz(i.get("runs"))
@@ -64,22 +83,22 @@ def format_match_summary(payload: Dict[str, Any]):
     tb = payload.get("top_batters", [])
     if isinstance(tb, list) and tb:
         lines.append("")
-        lines.append(header("Top Batters"))
-        lines.append(bullet_list([
-            f"Inns {r.get('innings')}: {r.get('batter')} - {r.get('runs')} ({r.get('balls')}) "
-            f"4x{r.get('fours')} 6x{r.get('sixes')} SR {r.get('strike_rate')}"
+        lines.append(_HDR_TOP_BATTERS)
+        lines.append("\n".join(
+            _ROW_TOP_BATTER % (r.get("innings"), r.get("batter"), r.get("runs"), r.get("balls"),
+                               r.get("fours"), r.get("sixes"), r.get("strike_rate"))
             for r in tb
-        ]))
+        ))
 
     bw = payload.get("top_bowlers", [])
     if isinstance(bw, list) and bw:
         lines.append("")
-        lines.append(header("Top Bowlers"))
-        lines.append(bullet_list([
-            f"Inns {r.get('innings')}: {r.get('bowler')} - {r.get('wickets')}/{r.get('runs_conceded')} "
-            f"in {overs(r.get('overs'))} (Econ {r.get('economy')})"
+        lines.append(_HDR_TOP_BOWLERS)
+        lines.append("\n".join(
+            _ROW_TOP_BOWLER % (r.get("innings"), r.get("bowler"), r.get("wickets"), r.get("runs_conceded"),
+                               overs(r.get("overs")), r.get("economy"))
             for r in bw
-        ]))
+        ))
 
     ev = payload.get("evidence", {})
     if isinstance(ev, dict) and ev.get("match_id"):
@@ -92,7 +111,7 @@ def format_player_stats(payload: Dict[str, Any]):
     """Render a player's batting/bowling overview plus matchup nuggets and team history."""
     if "error" in payload:
         if "choices" in payload and payload["choices"]:
-            return payload["error"] + "\n" + header("Did you mean?") + "\n" + bullet_list(payload["choices"])
+            return payload["error"] + "\n" + _HDR_DID_YOU_MEAN + "\n" + bullet_list(payload["choices"])
         return f"{payload['error']}"
 
     inp = payload.get("input", {}) or {}
@@ -104,7 +123,7 @@ def format_player_stats(payload: Dict[str, Any]):
     bat = payload.get("batting", {}) or {}
     lines += [
         "",
-        header("Batting"),
+        _HDR_BATTING,
         f"Matches: {nz(bat.get('matches'))}  |  Inns: {nz(bat.get('inns'))}",
         f"Runs: {nz(bat.get('runs'))}  |  Balls: {nz(bat.get('balls'))}",
         f"4s/6s: {nz(bat.get('fours'))}/{nz(bat.get('sixes'))}",
@@ -116,7 +135,7 @@ def format_player_stats(payload: Dict[str, Any]):
     nb = m_bat.get("nemesis_bowler")
     fb = m_bat.get("favourite_bowler")
     if nb or fb:
-        lines += ["", header("Batting Matchups")]
+        lines += ["", _HDR_BATTING_MATCHUPS]
         if nb:
             lines.append(
                 f"Nemesis bowler: {s(nb.get('bowler'))} - outs {nz(nb.get('outs'))}, "
@@ -131,7 +150,7 @@ def format_player_stats(payload: Dict[str, Any]):
     bowl = payload.get("bowling", {}) or {}
     lines += [
         "",
-        header("Bowling"),
+        _HDR_BOWLING,
         f"Matches: {nz(bowl.get('matches'))}",
         f"Overs: {overs(bowl.get('overs'))}  |  Wkts: {nz(bowl.get('wickets'))}",
         f"Runs Conceded: {nz(bowl.get('runs_conceded'))}  |  Econ: {nz(bowl.get('economy','-'))}",
@@ -142,7 +161,7 @@ def format_player_stats(payload: Dict[str, Any]):
     md = m_bowl.get("most_dismissed_batter")
     ww = m_bowl.get("worst_vs_batter")
     if md or ww:
-        lines += ["", header("Bowling Matchups")]
+        lines += ["", _HDR_BOWLING_MATCHUPS]
         if md:
             lines.append(
                 f"Most dismissals: {s(md.get('batter'))} - outs {nz(md.get('outs'))}, "
@@ -157,7 +176,7 @@ def format_player_stats(payload: Dict[str, Any]):
     teams = payload.get("teams", []) or []
     last_team = payload.get("last_team") or {}
     if teams or last_team:
-        lines += ["", header("Teams")]
+        lines += ["", _HDR_TEAMS]
         if teams:
             lines.append(", ".join(teams))
         if last_team:
@@ -190,7 +209,7 @@ def format_player_vs_team(payload: Dict[str, Any]):
     """Summarize one player's batting/bowling vs a specific opponent (optionally per season)."""
     if "error" in payload:
         if "choices" in payload and payload["choices"]:
-            return payload["error"] + "\n" + header("Did you mean?") + "\n" + bullet_list(payload["choices"])
+            return payload["error"] + "\n" + _HDR_DID_YOU_MEAN + "\n" + bullet_list(payload["choices"])
         return f"{payload['error']}"
     inp = payload.get("input", {}) or {}
     title = f"{s(inp.get('resolved_name') or inp.get('player_query'))} vs {s(inp.get('opponent'))}"
@@ -200,14 +219,14 @@ def format_player_vs_team(payload: Dict[str, Any]):
     bat = payload.get("batting_vs_team", {}) or {}
     lines += [
         "",
-        header("Batting vs Opponent"),
+        _HDR_BAT_VS,
         f"Runs: {nz(bat.get('runs'))}  |  Balls: {nz(bat.get('balls'))}  |  4s/6s: {nz(bat.get('fours'))}/{nz(bat.get('sixes'))}",
         f"SR: {nz(bat.get('sr','-'))}  |  Avg: {nz(bat.get('average','-'))}"
     ]
     bowl = payload.get("bowling_vs_team", {}) or {}
     lines += [
         "",
-        header("Bowling vs Opponent"),
+        _HDR_BOWL_VS,
         f"Overs: {overs(bowl.get('overs'))}  |  Wkts: {nz(bowl.get('wickets'))}  |  Runs: {nz(bowl.get('runs_conceded'))}",
         f"Econ: {nz(bowl.get('economy','-'))}"
     ]
@@ -219,7 +238,7 @@ def format_head_to_head(payload: Dict[str, Any]):
         return f"{payload['error']}"
     summ = payload.get("summary", {}) or {}
 
-    lines = [header("Head-to-Head")]
+    lines = [_HDR_H2H]
     wins_bits = []
     for k, v in summ.items():
         if k.startswith("wins_"):
@@ -242,7 +261,7 @@ def format_head_to_head(payload: Dict[str, Any]):
     stars = payload.get("star_performers", {}) or {}
     if stars:
         lines.append("")
-        lines.append(header("Star Performers"))
+        lines.append(_HDR_STARS)
 
         def fmt_bat(tag, rec):
             """Format batting star performer stats."""
@@ -309,17 +328,18 @@ def format_best_phase_bowlers(payload: Dict[str, Any]):
 
     return "\n".join(lines)
 
+_FORMATTERS = {
+    "match_summary": format_match_summary,
+    "player_stats": format_player_stats,
+    "team_squad": format_team_squad,
+    "player_vs_team": format_player_vs_team,
+    "head_to_head": format_head_to_head,
+    "best_phase_bowler": format_best_phase_bowlers,
+}
+
 def format_answer(intent: str, result: Dict[str, Any]):
     """Dispatch to the appropriate formatter based on intent/prompt."""
-    mapping = {
-        "match_summary": format_match_summary,
-        "player_stats": format_player_stats,
-        "team_squad": format_team_squad,
-        "player_vs_team": format_player_vs_team,
-        "head_to_head": format_head_to_head,
-        "best_phase_bowler": format_best_phase_bowlers,
-    }
-    f = mapping.get(intent)
+    f = _FORMATTERS.get(intent)
     if not f:
         return "I didn't understand that request."
     return f(result)
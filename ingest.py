@@ -1,464 +1,902 @@
-"""
-@author: satvi
-"""
-
-"""
-DuckDB manager for CricSheet IPL data.
-
-Modes:
-  1) SANITY CHECK (no --folder and no --match/--info):
-       python ingest.py --db ipl_data.duckdb
-
-  2) SINGLE-PAIR INGEST:
-       python ingest.py --db ipl_data.duckdb \
-         --match /path/match_id.csv --info /path/match_id__info.csv
-
-  3) BULK INGEST FOLDER (Ingest all the available matches data into a DuckDB):
-       python ingest.py --db ipl_data.duckdb \
-         --folder /path/to/data
-"""
-
-import argparse, os, re, sys, json
-from typing import Dict
-import pandas as pd
-import duckdb
-import csv
-
-def read_info_kv(info_csv_path: str) -> dict:
-    """
-    Build a flat dict like:
-      info.season, info.date, info.venue, info.winner, info.winner_runs, ...
-    """
-    out = {}
-    with open(info_csv_path, "r", encoding="utf-8", newline="") as f:
-        for row in csv.reader(f):
-            if not row:
-                continue
-            tag = (row[0] or "").strip()
-            if len(row) == 2:
-                key = tag
-                val = (row[1] or "").strip()
-            else:
-                key = (row[1] or "").strip()
-                val = ",".join(row[2:]).strip()
-
-            if tag.lower() in {"info", "outcome", "innings", "player"}:
-                flat_key = f"{tag.lower()}.{key}"
-            else:
-                flat_key = key if key else tag
-
-            if flat_key and val:
-                out[flat_key] = val
-    return out
-
-def get_winner(info: dict, team1: str, team2: str):
-    """
-    Return the winner string or None for Tie/NR.
-    """
-    cand = (
-        info.get("info.winner")
-    )
-
-    result = (info.get("outcome.result") or info.get("result") or "").strip().lower()
-    if result in {"tie", "no result", "abandoned"}:
-        return None
-
-    if not cand:
-        return None
-
-    def norm(s: str) -> str:
-        s = s.replace("\xa0", " ")
-        s = re.sub(r"[.\u200d\-]", " ", s)
-        s = re.sub(r"\s+", " ", s).strip().lower()
-        return s
-
-    n_cand = norm(cand)
-    if team1 and n_cand == norm(team1): return team1
-    if team2 and n_cand == norm(team2): return team2
-    if team1 and norm(team1) in n_cand: return team1
-    if team2 and norm(team2) in n_cand: return team2
-    return cand
-
-def normalize_season(season: str):
-    """Known IPL cross-year season formats to single-year equivalents."""
-    if not season:
-        return season
-    season = str(season).strip()
-    mapping = {
-        "2007/08": "2008",
-        "2009/10": "2009",
-        "2020/21": "2020",
-    }
-    return mapping.get(season, season)
-def parse_info_csv(path: str) -> Dict:
-    """
-    Parses info from info file about match like umpires, players, venue, winner etc.
-    """
-    info_raw = {"version": None, "info": {}, "teams": [], "players": {},
-                "umpires": [], "referees": [], "outcome": {},
-                "player_of_match": [], "innings_order": []}
-    with open(path, "r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line: continue
-            parts = line.split(",", 2)
-            tag = parts[0]
-            if tag == "version":
-                info_raw["version"] = parts[1] if len(parts) > 1 else None
-                continue
-            if tag == "info" and len(parts) >= 3:
-                k, v = parts[1], parts[2]
-                if k == "team": info_raw["teams"].append(v)
-                elif k in ("umpire","tv_umpire","umpire1","umpire2"): info_raw["umpires"].append(v)
-                elif k in ("match_referee"): info_raw["referees"].append(v)
-                elif k == "player_of_match": info_raw["player_of_match"].append(v)
-                else: info_raw["info"][k] = v
-                continue
-            if tag == "innings" and len(parts) == 3:
-                sub = parts[1].split(",", 1)
-                if len(sub) == 2 and sub[1] == "team": info_raw["innings_order"].append(parts[2])
-                continue
-            if tag == "player" and len(parts) >= 3:
-                team, player = parts[1], parts[2]
-                info_raw["players"].setdefault(team, []).append(player)
-                continue
-            if tag == "outcome" and len(parts) >= 3:
-                k, v = parts[1], parts[2]
-                info_raw["outcome"][k] = v
-                continue
-
-    # Build base fields
-    team1 = info_raw["teams"][0] if len(info_raw["teams"]) > 0 else None
-    team2 = info_raw["teams"][1] if len(info_raw["teams"]) > 1 else None
-
-    #flatten the csv out
-    info_kv = read_info_kv(path)
-    winner_final = get_winner(info_kv, team1 or "", team2 or "")
-
-    return {
-        "match_id": None,
-        "season":  info_raw["info"].get("season"),
-        "date":    info_raw["info"].get("date"),
-        "venue":   info_raw["info"].get("venue"),
-        "event":   info_raw["info"].get("event"),
-        "match_number": info_raw["info"].get("match_number"),
-        "teams":   info_raw["teams"],
-        "team1":   team1,
-        "team2":   team2,
-        "player_of_match": info_raw["player_of_match"][0] if info_raw["player_of_match"] else None,
-        "winner":  winner_final,  
-        "umpires": info_raw["umpires"],
-        "referees": info_raw["referees"],
-        "innings_order": info_raw["innings_order"],
-        "players_map": info_raw["players"],
-    }
-
-def split_over_ball(x):
-    """
-    Splits a ball string like "4.2" into (over, ball) integers.
-    """
-    try:
-        s = str(x)
-        if "." in s:
-            o, b = s.split(".", 1)
-            return int(o), int(b)
-        return int(s), 0
-    except Exception:
-        return None, None
-
-def phase_from_over(o: int):
-    """
-    Returns the bowling phase ("PP", "Middle", or "Death") based on the over number.
-    """
-    if o is None: return None
-    if 1 <= o <= 6: return "PP"
-    if 7 <= o <= 15: return "Middle"
-    return "Death"
-
-def parse_deliveries_csv(path: str):
-    """
-    Loads and cleans a deliveries CSV, computes derived columns (over, ball, phase, boundaries, dots), and ensures schema consistency.
-    """
-    df = pd.read_csv(path)
-    rename_map = {
-        "runs_off_bat": "runs_batter",
-        "extras": "runs_extras",
-        "batsman": "striker",
-    }
-    df = df.rename(columns={k:v for k,v in rename_map.items() if k in df.columns})
-
-    if "runs_extras" not in df.columns: df["runs_extras"] = 0
-    if "runs_batter" not in df.columns: df["runs_batter"] = 0
-
-    df["runs_total"] = df["runs_batter"].fillna(0) + df["runs_extras"].fillna(0)
-
-    ob = df["ball"].apply(split_over_ball)
-    df["over"] = ob.apply(lambda t: t[0])
-    df["ball_number"] = ob.apply(lambda t: t[1])
-    df["over_ball"] = df["over"].astype("Int64").astype(str) + "." + df["ball_number"].astype("Int64").astype(str)
-
-    wicket_cols = [c for c in ["wicket_type","dismissal_kind"] if c in df.columns]
-    is_wicket = pd.Series(False, index=df.index)
-    for c in wicket_cols: is_wicket = is_wicket | df[c].notna()
-
-    df["is_boundary"] = df["runs_batter"].fillna(0).isin([4,6])
-    df["is_dot"] = (df["runs_total"].fillna(0) == 0) & (~is_wicket)
-    df["phase"] = df["over"].apply(phase_from_over)
-
-    # Enforcing required columns exist check
-    required = ["match_id","season","start_date","venue","innings",
-                "batting_team","bowling_team","striker","non_striker","bowler"]
-    for col in required:
-        if col not in df.columns: df[col] = pd.NA
-
-    # Ensure optional columns exist 
-    optional = [
-        "wides","noballs","byes","legbyes","penalty",
-        "wicket_type","other_wicket_type",
-        "dismissal_kind","player_dismissed","other_player_dismissed",
-    ]
-    for col in optional:
-        if col not in df.columns:
-            df[col] = 0 if col in ["wides","noballs","byes","legbyes","penalty"] else pd.NA
-
-    return df
-
-
-# DuckDB Schema
-# Defines the DuckDB schema for the deliveries table containing every ball-by-ball record of an IPL match.
-DDL_DELIVERIES = """
-CREATE TABLE IF NOT EXISTS deliveries (
-    match_id BIGINT, season TEXT, start_date DATE, venue TEXT,
-    innings INTEGER, ball VARCHAR, over INTEGER, ball_number INTEGER, over_ball VARCHAR,
-    batting_team TEXT, bowling_team TEXT,
-    striker TEXT, non_striker TEXT, bowler TEXT,
-    runs_batter INTEGER, runs_extras INTEGER, runs_total INTEGER,
-    wides INTEGER, noballs INTEGER, byes INTEGER, legbyes INTEGER, penalty INTEGER,
-    wicket_type TEXT, other_wicket_type TEXT, dismissal_kind TEXT,
-    player_dismissed TEXT, other_player_dismissed TEXT,
-    is_boundary BOOLEAN, is_dot BOOLEAN, phase TEXT
-);
-"""
-# Defines the DuckDB schema for the matches_meta table storing per-match metadata like teams, venue, date, and participants.
-DDL_MATCHES_META = """
-CREATE TABLE IF NOT EXISTS matches_meta (
-    match_id BIGINT,
-    season TEXT, date DATE, venue TEXT, event TEXT, match_number TEXT,
-    team1 TEXT, team2 TEXT,
-    teams_json JSON, player_of_match TEXT, winner TEXT,
-    umpires_json JSON, referees_json JSON,
-    innings_order_json JSON, players_map_json JSON
-);
-"""
-
-def ensure_tables(con: duckdb.DuckDBPyConnection):
-    """
-    Ensures both deliveries and matches_meta tables exist by creating them if missing.
-    """
-    con.execute(DDL_DELIVERIES)
-    con.execute(DDL_MATCHES_META)
-
-def upsert_match(con: duckdb.DuckDBPyConnection, deliveries: pd.DataFrame, meta: Dict):
-    """
-    Replaces existing match data and inserts updated deliveries plus match metadata into the database.
-    """
-    match_id = int(str(deliveries["match_id"].iloc[0])) if "match_id" in deliveries.columns and pd.notna(deliveries["match_id"].iloc[0]) else None
-    if match_id is None:
-        raise ValueError("match_id not found in deliveries CSV")
-
-    meta_row = {
-        "match_id": match_id,
-        "season": meta.get("season"), "date": meta.get("date"), "venue": meta.get("venue"),
-        "event": meta.get("event"), "match_number": meta.get("match_number"),
-        "team1": meta.get("team1"), "team2": meta.get("team2"),
-        "teams_json": json.dumps(meta.get("teams", [])),
-        "player_of_match": meta.get("player_of_match"), "winner": meta.get("winner"),
-        "umpires_json": json.dumps(meta.get("umpires", [])),
-        "referees_json": json.dumps(meta.get("referees", [])),
-        "innings_order_json": json.dumps(meta.get("innings_order", [])),
-        "players_map_json": json.dumps(meta.get("players_map", {})),
-    }
-
-    ensure_tables(con)
-
-    con.execute("DELETE FROM deliveries   WHERE match_id = ?", [match_id])
-    con.execute("DELETE FROM matches_meta WHERE match_id = ?", [match_id])
-
-    con.register("tmp_deliveries", deliveries)
-    con.execute("""
-        INSERT INTO deliveries
-        SELECT
-            match_id, season, start_date, venue, innings, CAST(ball AS VARCHAR),
-            over, ball_number, over_ball, batting_team, bowling_team,
-            striker, non_striker, bowler,
-            COALESCE(runs_batter,0), COALESCE(runs_extras,0), COALESCE(runs_total,0),
-            COALESCE(wides,0), COALESCE(noballs,0), COALESCE(byes,0),
-            COALESCE(legbyes,0), COALESCE(penalty,0),
-            wicket_type, other_wicket_type, dismissal_kind,
-            player_dismissed, other_player_dismissed,
-            is_boundary, is_dot, phase
-        FROM tmp_deliveries
-    """)
-    con.unregister("tmp_deliveries")
-
-    con.register("tmp_meta", pd.DataFrame([meta_row]))
-    con.execute("""
-        INSERT INTO matches_meta
-        SELECT match_id, season, date, venue, event, match_number, team1, team2,
-               teams_json, player_of_match, winner, umpires_json, referees_json,
-               innings_order_json, players_map_json
-        FROM tmp_meta
-    """)
-    con.unregister("tmp_meta")
-
-def find_pairs(folder: str):
-    """
-    Scans a directory for match_id.csv and match_id_info.csv pairs for bulk data ingestion.
-    """
-    PAIR_INFO_RE = re.compile(r"^(\d+)_info\.csv$", re.IGNORECASE)
-    entries = os.listdir(folder)
-    info_files = [f for f in entries if PAIR_INFO_RE.match(f)]
-    pairs = []
-    for info_name in info_files:
-        mid = PAIR_INFO_RE.match(info_name).group(1)
-        deliveries_name = f"{mid}.csv"
-        info_path = os.path.join(folder, info_name)
-        deliveries_path = os.path.join(folder, deliveries_name)
-        if os.path.exists(deliveries_path):
-            pairs.append((mid, deliveries_path, info_path))
-        else:
-            print(f"[skip] Missing deliveries for {mid}: {deliveries_path}")
-    return pairs
-
-
-# Sanity Mode (one pair of match_id.csv and match_id_info.csv)
-
-# SQL query summarizing match coverage per season, including number of matches and participating teams.
-COVERAGE_SQL = """
-WITH seasons AS (
-  SELECT season, COUNT(*) AS matches
-  FROM matches_meta
-  GROUP BY season
-),
-teams_union AS (
-  SELECT season, team1 AS team FROM matches_meta
-  UNION ALL
-  SELECT season, team2 AS team FROM matches_meta
-),
-teams_agg AS (
-  SELECT season, STRING_AGG(DISTINCT team, ', ') AS teams_csv
-  FROM teams_union
-  GROUP BY season
-)
-SELECT s.season, s.matches, t.teams_csv AS teams
-FROM seasons s
-LEFT JOIN teams_agg t USING (season)
-ORDER BY s.season;
-"""
-
-def sanity(con: duckdb.DuckDBPyConnection):
-    """
-    Performs integrity checks: prints record counts, coverage summary, sample matches, and the deliveries table schema.
-    """
-    ensure_tables(con)
-    # counts total matches in the db
-    cnt_meta = con.execute("SELECT COUNT(*) FROM matches_meta").fetchone()[0]
-    cnt_delv = con.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
-    print(f"[sanity] matches_meta rows: {cnt_meta}")
-    print(f"[sanity] deliveries rows:   {cnt_delv}")
-
-    # show a few seasons + teams
-    try:
-        df_cov = con.execute(COVERAGE_SQL).df()
-        if not df_cov.empty:
-            print("\n[coverage by season]")
-            print(df_cov.to_string(index=False))
-        else:
-            print("\n[coverage by season] (no rows)")
-    except Exception as e:
-        print(f"[coverage] skipped due to error: {e}")
-
-    # peek five matches (head)
-    df_matches = con.execute("""
-        SELECT match_id, season, date, team1, team2, venue, player_of_match, winner
-        FROM matches_meta
-        ORDER BY date NULLS LAST, match_id
-        LIMIT 5
-    """).df()
-    print("\n[sample matches_meta]")
-    print(df_matches.to_string(index=False))
-
-    # columns present in deliveries
-    df_cols = con.execute("""
-        SELECT column_name, data_type
-        FROM information_schema.columns
-        WHERE table_name = 'deliveries'
-        ORDER BY column_name
-    """).df()
-    print("\n[deliveries schema columns]")
-    print(df_cols.to_string(index=False))
-
-
-# CLI
-
-#Entry point handling CLI arguments for bulk ingestion, single match ingestion, or running database sanity checks.
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--db", default="ipl_data.duckdb", help="DuckDB file path")
-    ap.add_argument("--folder", help="Folder with <id>.csv and <id>_info.csv for BULK INGEST")
-    ap.add_argument("--match", help="Path to <id>.csv for SINGLE-PAIR INGEST")
-    ap.add_argument("--info",  help="Path to <id>_info.csv for SINGLE-PAIR INGEST")
-    args = ap.parse_args()
-
-    con = duckdb.connect(args.db)
-
-    # Mode selection
-    if args.folder:
-        # BULK INGEST
-        pairs = find_pairs(args.folder)
-        if not pairs:
-            print("[bulk] No pairs found. Check --folder path.")
-            sanity(con)
-            con.close()
-            sys.exit(1)
-        ok = fail = 0
-        for mid, deliveries_path, info_path in sorted(pairs, key=lambda x: int(x[0])):
-            try:
-                deliveries = parse_deliveries_csv(deliveries_path)
-                meta = parse_info_csv(info_path)
-                meta["season"] = normalize_season(meta.get("season"))
-                if "match_id" in deliveries.columns and pd.notna(deliveries["match_id"].iloc[0]):
-                    meta["match_id"] = int(str(deliveries["match_id"].iloc[0]))
-                upsert_match(con, deliveries, meta)
-                ok += 1
-                if ok % 100 == 0:
-                    print(f"[progress] Ingested {ok} matches...")
-            except Exception as e:
-                fail += 1
-                print(f"[fail] {mid}: {e}")
-        print(f"\n[bulk] Success: {ok}  Failed: {fail}  Total: {ok+fail}")
-        sanity(con)
-        con.close()
-        return
-
-    if args.match and args.info:
-        # SINGLE-PAIR INGEST
-        deliveries = parse_deliveries_csv(args.match)
-        meta = parse_info_csv(args.info)
-        meta["season"] = normalize_season(meta.get("season"))
-        if "match_id" in deliveries.columns and pd.notna(deliveries["match_id"].iloc[0]):
-            meta["match_id"] = int(str(deliveries["match_id"].iloc[0]))
-        upsert_match(con, deliveries, meta)
-        print("[pair] Ingested one match.")
-        sanity(con)
-        con.close()
-        return
-
-    # SANITY-ONLY (no folder, no match/info)
-    print("[sanity-only] Connecting to DB and inspecting…")
-    sanity(con)
-    con.close()
-
-
-if __name__ == "__main__":
-    main()
+"""
+@author: satvi
+"""
+
+"""
+DuckDB manager for CricSheet IPL data.
+
+Modes:
+  1) SANITY CHECK (no --folder and no --match/--info), also rebuilds the derived lookup tables:
+       python ingest.py --db ipl_data.duckdb
+
+  2) SINGLE-PAIR INGEST:
+       python ingest.py --db ipl_data.duckdb \
+         --match /path/match_id.csv --info /path/match_id__info.csv
+
+  3) BULK INGEST FOLDER (Ingest all the available matches data into a DuckDB):
+       python ingest.py --db ipl_data.duckdb \
+         --folder /path/to/data
+"""
+
+import argparse, os, re, sys, json
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import duckdb
+import csv
+
+# Team-name normalisation for get_winner
+_NORM_PUNCT_RE = re.compile(r"[.\u200d\-]")
+_NORM_WS_RE = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=256)
+def _norm_team(s: str) -> str:
+    """
+    Normalises a team name for comparison; cached since the same few franchise names recur in every match.
+    """
+    s = s.replace("\xa0", " ")
+    s = _NORM_PUNCT_RE.sub(" ", s)
+    s = _NORM_WS_RE.sub(" ", s).strip().lower()
+    return s
+
+def get_winner(info: dict, team1: str, team2: str):
+    """
+    Return the winner string or None for Tie/NR.
+    """
+    cand = (
+        info.get("info.winner")
+    )
+
+    result = (info.get("outcome.result") or info.get("result") or "").strip().lower()
+    if result in {"tie", "no result", "abandoned"}:
+        return None
+
+    if not cand:
+        return None
+
+    n_cand = _norm_team(cand)
+    if team1 and n_cand == _norm_team(team1): return team1
+    if team2 and n_cand == _norm_team(team2): return team2
+    if team1 and _norm_team(team1) in n_cand: return team1
+    if team2 and _norm_team(team2) in n_cand: return team2
+    return cand
+
+def normalize_season(season: str):
+    """Known IPL cross-year season formats to single-year equivalents."""
+    if not season:
+        return season
+    season = str(season).strip()
+    mapping = {
+        "2007/08": "2008",
+        "2009/10": "2009",
+        "2020/21": "2020",
+    }
+    return mapping.get(season, season)
+def parse_info_csv(path: str) -> Dict:
+    """
+    Parses info from info file about match like umpires, players, venue, winner etc.
+    """
+    info_raw = {"version": None, "info": {}, "teams": [], "players": {},
+                "umpires": [], "referees": [], "outcome": {},
+                "player_of_match": [], "innings_order": []}
+    # Flat "tag.key" -> value view of the same lines (info.winner, info.outcome, ...) for get_winner
+    info_kv = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not any(row): continue
+            # tag, key, and the rest of the row as the value (e.g. "info,player,<team>,<name>" -> "<team>,<name>")
+            tag = row[0]
+            k = row[1] if len(row) > 1 else None
+            v = ",".join(row[2:]) if len(row) > 2 else None
+            if v:
+                info_kv[f"{tag.lower()}.{k}"] = v
+            if tag == "version":
+                info_raw["version"] = k
+                continue
+            if tag == "info" and v is not None:
+                if k == "team": info_raw["teams"].append(v)
+                elif k in ("umpire","tv_umpire","umpire1","umpire2"): info_raw["umpires"].append(v)
+                elif k in ("match_referee"): info_raw["referees"].append(v)
+                elif k == "player_of_match": info_raw["player_of_match"].append(v)
+                else: info_raw["info"][k] = v
+                continue
+            if tag == "innings" and v is not None:
+                sub = k.split(",", 1)
+                if len(sub) == 2 and sub[1] == "team": info_raw["innings_order"].append(v)
+                continue
+            if tag == "player" and v is not None:
+                info_raw["players"].setdefault(k, []).append(v)
+                continue
+            if tag == "outcome" and v is not None:
+                info_raw["outcome"][k] = v
+                continue
+
+    # Build base fields
+    team1 = info_raw["teams"][0] if len(info_raw["teams"]) > 0 else None
+    team2 = info_raw["teams"][1] if len(info_raw["teams"]) > 1 else None
+
+    winner_final = get_winner(info_kv, team1 or "", team2 or "")
+
+    return {
+        "match_id": None,
+        "season":  info_raw["info"].get("season"),
+        "date":    info_raw["info"].get("date"),
+        "venue":   info_raw["info"].get("venue"),
+        "event":   info_raw["info"].get("event"),
+        "match_number": info_raw["info"].get("match_number"),
+        "teams":   info_raw["teams"],
+        "team1":   team1,
+        "team2":   team2,
+        "player_of_match": info_raw["player_of_match"][0] if info_raw["player_of_match"] else None,
+        "winner":  winner_final,  
+        "umpires": info_raw["umpires"],
+        "referees": info_raw["referees"],
+        "innings_order": info_raw["innings_order"],
+        "players_map": info_raw["players"],
+    }
+
+def phase_from_over(overs: pa.ChunkedArray) -> pa.Array:
+    """
+    Returns the bowling phase ("PP", "Middle", or "Death") for each over number, null where the over is missing.
+    Cricsheet overs are 0-based: PP = 0-5, Middle = 6-14, Death = 15+.
+    """
+    o = pc.cast(overs, pa.float64()).to_numpy()  # nulls come back as NaN
+    phase = np.select([o <= 5, o <= 14], ["PP", "Middle"], default="Death").astype(object)
+    phase[np.isnan(o)] = None
+    return pa.array(phase, type=pa.string())
+
+# pandas' default NA markers, so pyarrow reads missing values exactly like pd.read_csv did
+CSV_NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                   "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+# Low-cardinality text columns handed to DuckDB dictionary-encoded
+# (DuckDB stores them with dictionary compression too; team names are an open set, so no ENUM like phase_t)
+DICT_COLUMNS = ("season", "venue", "batting_team", "bowling_team", "phase")
+
+def _to_int(strings: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Casts text to int64, with null for anything that is not a plain integer (pd.to_numeric(errors="coerce")).
+    """
+    valid = pc.match_substring_regex(strings, r"^\s*[+-]?\d+\s*$")
+    return pc.cast(pc.utf8_trim_whitespace(pc.if_else(valid, strings, None)), pa.int64())
+
+def parse_deliveries_csv(path: str) -> pa.Table:
+    """
+    Loads and cleans a deliveries CSV, computes derived columns (over, ball, phase, boundaries, dots), and ensures schema consistency.
+    Reads and derives with pyarrow only, so the Arrow table goes to DuckDB without any pandas conversion.
+    """
+    tbl = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(
+        # as text: "2.10" (10th ball) must not collapse to 2.1, and "2008" stays a string so season gets dictionary-encoded
+        column_types={"ball": pa.string(), "season": pa.string()},
+        null_values=CSV_NULL_VALUES,
+        strings_can_be_null=True,
+    ))
+    rename_map = {
+        "runs_off_bat": "runs_batter",
+        "extras": "runs_extras",
+        "batsman": "striker",
+    }
+    tbl = tbl.rename_columns([rename_map.get(c, c) for c in tbl.column_names])
+    n = tbl.num_rows
+
+    def set_col(name, values):
+        i = tbl.schema.get_field_index(name)
+        return tbl.set_column(i, name, values) if i >= 0 else tbl.append_column(name, values)
+
+    zeros = pa.array(np.zeros(n, dtype="int64"))
+    if "runs_extras" not in tbl.column_names: tbl = tbl.append_column("runs_extras", zeros)
+    if "runs_batter" not in tbl.column_names: tbl = tbl.append_column("runs_batter", zeros)
+
+    rb = pc.fill_null(pc.cast(tbl.column("runs_batter"), pa.int64()), 0)
+    rx = pc.fill_null(pc.cast(tbl.column("runs_extras"), pa.int64()), 0)
+    runs_total = pc.add(rb, rx)
+    tbl = set_col("runs_total", runs_total)
+
+    # "4.2" -> over 4, ball 2 ("4" -> ball 0); unparseable values become null in both
+    ball = pc.cast(tbl.column("ball"), pa.string())
+    ball = pc.if_else(pc.match_substring(ball, "."), ball, pc.binary_join_element_wise(ball, "0", "."))
+    parts = pc.split_pattern(ball, ".", max_splits=1)
+    over = _to_int(pc.list_element(parts, 0))
+    ball_number = _to_int(pc.list_element(parts, 1))
+    bad = pc.or_kleene(pc.is_null(over), pc.is_null(ball_number))
+    over = pc.if_else(bad, None, over)
+    ball_number = pc.if_else(bad, None, ball_number)
+    tbl = set_col("over", over)
+    tbl = set_col("ball_number", ball_number)
+    tbl = set_col("over_ball", pc.binary_join_element_wise(pc.cast(over, pa.string()), pc.cast(ball_number, pa.string()), "."))
+
+    wicket_cols = [c for c in ["wicket_type","dismissal_kind"] if c in tbl.column_names]
+    is_wicket = pa.array(np.zeros(n, dtype=bool))
+    for c in wicket_cols: is_wicket = pc.or_(is_wicket, pc.is_valid(tbl.column(c)))
+
+    tbl = set_col("is_boundary", pc.is_in(rb, value_set=pa.array([4, 6], pa.int64())))
+    tbl = set_col("is_dot", pc.and_(pc.equal(runs_total, 0), pc.invert(is_wicket)))
+    tbl = set_col("phase", phase_from_over(over))
+
+    # Enforcing required columns exist check
+    required = ["match_id","season","start_date","venue","innings",
+                "batting_team","bowling_team","striker","non_striker","bowler"]
+    for col in required:
+        if col not in tbl.column_names: tbl = tbl.append_column(col, pa.nulls(n))
+
+    # Ensure optional columns exist 
+    optional = [
+        "wides","noballs","byes","legbyes","penalty",
+        "wicket_type","other_wicket_type",
+        "dismissal_kind","player_dismissed","other_player_dismissed",
+    ]
+    for col in optional:
+        if col not in tbl.column_names:
+            tbl = tbl.append_column(col, zeros if col in ["wides","noballs","byes","legbyes","penalty"] else pa.nulls(n))
+
+    for name in DICT_COLUMNS:
+        i = tbl.schema.get_field_index(name)
+        if i >= 0 and pa.types.is_string(tbl.schema.field(i).type):
+            tbl = tbl.set_column(i, name, tbl.column(i).cast(pa.dictionary(pa.int16(), pa.string())))
+    return tbl
+
+
+# DuckDB Schema
+# Defines the DuckDB schema for the deliveries table containing every ball-by-ball record of an IPL match.
+DDL_DELIVERIES = """
+CREATE TYPE IF NOT EXISTS phase_t AS ENUM ('PP', 'Middle', 'Death');
+CREATE TABLE IF NOT EXISTS deliveries (
+    match_id BIGINT, season TEXT, start_date DATE, venue TEXT,
+    innings INTEGER, ball VARCHAR, over INTEGER, ball_number INTEGER, over_ball VARCHAR,
+    batting_team TEXT, bowling_team TEXT,
+    striker TEXT, non_striker TEXT, bowler TEXT,
+    runs_batter INTEGER, runs_extras INTEGER, runs_total INTEGER,
+    wides INTEGER, noballs INTEGER, byes INTEGER, legbyes INTEGER, penalty INTEGER,
+    wicket_type TEXT, other_wicket_type TEXT, dismissal_kind TEXT,
+    player_dismissed TEXT, other_player_dismissed TEXT,
+    is_boundary BOOLEAN, is_dot BOOLEAN, phase phase_t,
+    is_legal BOOLEAN
+);
+"""
+# Defines the DuckDB schema for the matches_meta table storing per-match metadata like teams, venue, date, and participants.
+DDL_MATCHES_META = """
+CREATE TABLE IF NOT EXISTS matches_meta (
+    match_id BIGINT PRIMARY KEY,
+    season TEXT, date DATE, venue TEXT, event TEXT, match_number TEXT,
+    team1 TEXT, team2 TEXT,
+    teams_json JSON, player_of_match TEXT, winner TEXT,
+    umpires_json JSON, referees_json JSON,
+    innings_order_json JSON, players_map_json JSON
+);
+"""
+
+# Legal delivery (not a wide or no-ball), stored per row as is_legal so aggregates count it with a plain FILTER
+IS_LEGAL_SQL = "COALESCE(wides,0) = 0 AND COALESCE(noballs,0) = 0"
+
+def ensure_tables(con: duckdb.DuckDBPyConnection):
+    """
+    Ensures both deliveries and matches_meta tables exist by creating them if missing.
+    """
+    con.execute(DDL_DELIVERIES)
+    con.execute(DDL_MATCHES_META)
+
+    # Databases built before match_id became the key need it added for INSERT OR REPLACE
+    has_pk = con.execute("""
+        SELECT COUNT(*) FROM duckdb_constraints()
+        WHERE table_name = 'matches_meta' AND constraint_type = 'PRIMARY KEY'
+    """).fetchone()[0]
+    if not has_pk:
+        con.execute("ALTER TABLE matches_meta ADD PRIMARY KEY (match_id)")
+
+    # Databases built before is_legal was stored get the column added and filled in
+    has_legal = con.execute("""
+        SELECT COUNT(*) FROM duckdb_columns()
+        WHERE table_name = 'deliveries' AND column_name = 'is_legal'
+    """).fetchone()[0]
+    if not has_legal:
+        con.execute("ALTER TABLE deliveries ADD COLUMN is_legal BOOLEAN")
+        con.execute(f"UPDATE deliveries SET is_legal = {IS_LEGAL_SQL}")
+
+def meta_row(match_id: int, meta: Dict) -> Dict:
+    """
+    Flattens a parse_info_csv() dict into one matches_meta row.
+    """
+    return {
+        "match_id": match_id,
+        "season": meta.get("season"), "date": meta.get("date"), "venue": meta.get("venue"),
+        "event": meta.get("event"), "match_number": meta.get("match_number"),
+        "team1": meta.get("team1"), "team2": meta.get("team2"),
+        "teams_json": json.dumps(meta.get("teams", [])),
+        "player_of_match": meta.get("player_of_match"), "winner": meta.get("winner"),
+        "umpires_json": json.dumps(meta.get("umpires", [])),
+        "referees_json": json.dumps(meta.get("referees", [])),
+        "innings_order_json": json.dumps(meta.get("innings_order", [])),
+        "players_map_json": json.dumps(meta.get("players_map", {})),
+    }
+
+# Positional INSERT in DDL_MATCHES_META column order (meta_row() builds its dict in the same order)
+INSERT_META_SQL = "INSERT OR REPLACE INTO matches_meta VALUES (" + ", ".join(["?"] * 15) + ")"
+
+def insert_meta_rows(con: duckdb.DuckDBPyConnection, rows: List[Dict]):
+    """
+    Inserts any number of meta_row() dicts into matches_meta with a single INSERT, replacing rows already
+    stored for the same match_id. executemany is roughly 100x slower here, as it runs one statement per row.
+    """
+    con.register("tmp_meta", pa.Table.from_pylist(rows))
+    con.execute("""
+        INSERT OR REPLACE INTO matches_meta
+        SELECT match_id, season, date, venue, event, match_number, team1, team2,
+               teams_json, player_of_match, winner, umpires_json, referees_json,
+               innings_order_json, players_map_json
+        FROM tmp_meta
+    """)
+    con.unregister("tmp_meta")
+
+def insert_meta(con: duckdb.DuckDBPyConnection, match_id: int, meta: Dict):
+    """
+    Inserts one matches_meta row built from a parse_info_csv() dict.
+    """
+    con.execute(INSERT_META_SQL, list(meta_row(match_id, meta).values()))
+
+def first_match_id(deliveries: pa.Table):
+    """
+    Returns the match_id of the first delivery, or None if the column is missing or empty.
+    """
+    if "match_id" not in deliveries.column_names or deliveries.num_rows == 0:
+        return None
+    first = deliveries.column("match_id")[0].as_py()
+    return int(str(first)) if first is not None else None
+
+def upsert_match(con: duckdb.DuckDBPyConnection, deliveries: pa.Table, meta: Dict):
+    """
+    Replaces existing match data and inserts updated deliveries (from parse_deliveries_csv) plus match metadata into the database.
+    """
+    match_id = first_match_id(deliveries)
+    if match_id is None:
+        raise ValueError("match_id not found in deliveries CSV")
+
+    ensure_tables(con)
+
+    con.execute("DELETE FROM deliveries WHERE match_id = ?", [match_id])
+
+    con.register("tmp_deliveries", deliveries)
+    con.execute(f"""
+        INSERT INTO deliveries
+        SELECT
+            match_id, season, start_date, venue, innings, CAST(ball AS VARCHAR),
+            over, ball_number, over_ball, batting_team, bowling_team,
+            striker, non_striker, bowler,
+            COALESCE(runs_batter,0), COALESCE(runs_extras,0), COALESCE(runs_total,0),
+            COALESCE(wides,0), COALESCE(noballs,0), COALESCE(byes,0),
+            COALESCE(legbyes,0), COALESCE(penalty,0),
+            wicket_type, other_wicket_type, dismissal_kind,
+            player_dismissed, other_player_dismissed,
+            is_boundary, is_dot, phase,
+            {IS_LEGAL_SQL}
+        FROM tmp_deliveries
+    """)
+    con.unregister("tmp_deliveries")
+
+    insert_meta(con, match_id, meta)
+
+def read_csv_header(path: str):
+    """
+    Returns the header row of a CSV file as a tuple of column names.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return tuple(next(csv.reader(f), []))
+
+@functools.lru_cache(maxsize=None)
+def deliveries_select_sql(columns: tuple, same_header: bool = True) -> str:
+    """
+    Builds an INSERT-ready SELECT that reads raw deliveries CSVs (as text) with DuckDB's read_csv and derives
+    the same columns as parse_deliveries_csv (over, ball, phase, boundaries, dots) plus is_legal in SQL. The parameter may be
+    one path or a list of paths. When every file has exactly `columns` as its header (same_header), the schema is
+    declared up front so DuckDB skips sniffing each file; otherwise files are sniffed and matched up by column
+    name. Fields holding one of CSV_NULL_VALUES read as NULL and columns missing from the header become NULL
+    (or 0 for extras), just like the pyarrow path.
+    """
+    have = set(columns)
+    # Same NA markers as parse_deliveries_csv, so both paths store the same NULLs (and so wickets/dots)
+    nullstr = "[%s]" % ", ".join("'%s'" % v.replace("'", "''") for v in CSV_NULL_VALUES)
+    if same_header:
+        spec = ", ".join("'%s': 'VARCHAR'" % c.replace("'", "''") for c in columns)
+        source = (f"read_csv(?, header = true, auto_detect = false, delim = ',', quote = '\"', "
+                  f"nullstr = {nullstr}, columns = {{{spec}}})")
+    else:
+        source = f"read_csv(?, header = true, all_varchar = true, union_by_name = true, nullstr = {nullstr})"
+
+    def col(*names, default="NULL"):
+        for n in names:
+            if n in have:
+                return n
+        return default
+
+    def num(*names):
+        c = col(*names)
+        return f"COALESCE(TRY_CAST({c} AS INTEGER), 0)"
+
+    return f"""
+        SELECT
+            CAST(match_id AS BIGINT), season, CAST(start_date AS DATE), venue, CAST(innings AS INTEGER), ball,
+            _over, _ball, CAST(_over AS VARCHAR) || '.' || CAST(_ball AS VARCHAR),
+            batting_team, bowling_team, {col("striker", "batsman")}, non_striker, bowler,
+            _rb, _rx, _rb + _rx,
+            {num("wides")}, {num("noballs")}, {num("byes")}, {num("legbyes")}, {num("penalty")},
+            {col("wicket_type")}, {col("other_wicket_type")}, {col("dismissal_kind")},
+            {col("player_dismissed")}, {col("other_player_dismissed")},
+            _rb IN (4, 6),
+            (_rb + _rx) = 0 AND {col("wicket_type")} IS NULL AND {col("dismissal_kind")} IS NULL,
+            CASE WHEN _over IS NULL THEN NULL
+                 WHEN _over < 6 THEN 'PP'
+                 WHEN _over < 15 THEN 'Middle'
+                 ELSE 'Death' END,
+            {num("wides")} = 0 AND {num("noballs")} = 0
+        FROM (
+            SELECT *,
+                   CASE WHEN _b IS NOT NULL THEN _o END AS _over,
+                   CASE WHEN _o IS NOT NULL THEN _b END AS _ball
+            FROM (
+                SELECT *,
+                       TRY_CAST(split_part(ball, '.', 1) AS INTEGER) AS _o,
+                       TRY_CAST(COALESCE(NULLIF(split_part(ball, '.', 2), ''), '0') AS INTEGER) AS _b,
+                       {num("runs_off_bat", "runs_batter")} AS _rb,
+                       {num("extras", "runs_extras")} AS _rx
+                FROM {source}
+            )
+        )
+    """
+
+def upsert_match_csv(con: duckdb.DuckDBPyConnection, match_id: int, deliveries_path: str, meta: Dict):
+    """
+    Same as upsert_match, but DuckDB parses the deliveries CSV and derives every column itself (no pandas).
+    """
+    ensure_tables(con)
+
+    con.execute("DELETE FROM deliveries WHERE match_id = ?", [match_id])
+
+    select_sql = deliveries_select_sql(read_csv_header(deliveries_path))
+    con.execute(f"INSERT INTO deliveries {select_sql}", [deliveries_path])
+
+    insert_meta(con, match_id, meta)
+
+def upsert_matches_csv(con: duckdb.DuckDBPyConnection, matches: List[Tuple[int, str, Dict]]):
+    """
+    Bulk version of upsert_match_csv for (match_id, deliveries_path, meta) tuples: one DELETE,
+    one read_csv over every deliveries file and one matches_meta INSERT, all in a single transaction.
+    """
+    ensure_tables(con)
+    match_ids = [mid for mid, _, _ in matches]
+    paths = [path for _, path, _ in matches]
+
+    # Union of all headers so older files without e.g. other_wicket_type still line up by name
+    headers = set(read_csv_header(path) for path in paths)
+    columns = {}
+    for header in headers:
+        columns.update(dict.fromkeys(header))
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute("DELETE FROM deliveries WHERE match_id = ANY(?)", [match_ids])
+        con.execute(f"INSERT INTO deliveries {deliveries_select_sql(tuple(columns), len(headers) == 1)}", [paths])
+        insert_meta_rows(con, [meta_row(mid, meta) for mid, _, meta in matches])
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+def parse_pair_info(pair: Tuple[str, str, str]) -> Tuple[int, str, Dict, str]:
+    """
+    Process-pool worker for bulk ingest: parses one pair's info file into (match_id, deliveries_path, meta, error).
+    Errors come back as text instead of being raised so one bad file does not abort the whole pool.map.
+    """
+    mid, deliveries_path, info_path = pair
+    try:
+        # Cricsheet names each deliveries file after its match_id
+        meta = parse_info_csv(info_path)
+        meta["season"] = normalize_season(meta.get("season"))
+        meta["match_id"] = int(mid)
+        return int(mid), deliveries_path, meta, None
+    except Exception as e:
+        return mid, deliveries_path, None, str(e)
+
+# Matches per transaction when loading match by match
+COMMIT_EVERY = 500
+
+def upsert_matches_each(con: duckdb.DuckDBPyConnection, matches: List[Tuple[int, str, Dict]]) -> Tuple[int, int]:
+    """
+    Match-by-match fallback for upsert_matches_csv, committing every COMMIT_EVERY matches instead of per match.
+    DuckDB has no SAVEPOINTs, so a failing match rolls back its chunk, which is then replayed one match per
+    commit to skip just the bad file. Returns (ok, failed) counts.
+    """
+    ok = fail = 0
+    for start in range(0, len(matches), COMMIT_EVERY):
+        chunk = matches[start:start + COMMIT_EVERY]
+        con.execute("BEGIN TRANSACTION")
+        try:
+            for mid, deliveries_path, meta in chunk:
+                upsert_match_csv(con, mid, deliveries_path, meta)
+            con.execute("COMMIT")
+            ok += len(chunk)
+            print(f"[progress] Ingested {ok} matches...")
+            continue
+        except Exception:
+            con.execute("ROLLBACK")
+        for mid, deliveries_path, meta in chunk:
+            try:
+                upsert_match_csv(con, mid, deliveries_path, meta)
+                ok += 1
+            except Exception as e:
+                fail += 1
+                print(f"[fail] {mid}: {e}")
+    return ok, fail
+
+# Parquet cache
+# zstd Parquet snapshot of deliveries + matches_meta, one file per match and table (<dir>/<table>/match_id=<id>/),
+# so a database can be rebuilt with --from-parquet without re-parsing any CSV.
+PARQUET_TABLES = ("deliveries", "matches_meta")
+
+def export_parquet(con: duckdb.DuckDBPyConnection, cache_dir: str, match_ids: List[int]):
+    """
+    Writes the stored rows of the given matches to the Parquet cache, replacing files already there for them.
+    """
+    for table in PARQUET_TABLES:
+        target = os.path.join(cache_dir, table)
+        os.makedirs(target, exist_ok=True)
+        con.execute(f"""
+            COPY (SELECT * FROM {table} WHERE match_id = ANY(?))
+            TO '{target.replace("'", "''")}'
+            (FORMAT parquet, COMPRESSION zstd, PARTITION_BY (match_id), WRITE_PARTITION_COLUMNS true,
+             OVERWRITE_OR_IGNORE true)
+        """, [match_ids])
+
+def load_parquet(con: duckdb.DuckDBPyConnection, cache_dir: str) -> int:
+    """
+    Replaces every match found in the Parquet cache with its cached rows in one transaction.
+    Returns the number of matches loaded.
+    """
+    ensure_tables(con)
+    delv_glob, meta_glob = (os.path.join(cache_dir, table, "*", "*.parquet") for table in PARQUET_TABLES)
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute("""
+            DELETE FROM deliveries
+            WHERE match_id IN (SELECT match_id FROM read_parquet(?, hive_partitioning = false))
+        """, [delv_glob])
+        con.execute("INSERT INTO deliveries BY NAME SELECT * FROM read_parquet(?, hive_partitioning = false)", [delv_glob])
+        # Caches written before is_legal was stored don't carry it
+        con.execute(f"UPDATE deliveries SET is_legal = {IS_LEGAL_SQL} WHERE is_legal IS NULL")
+        con.execute("INSERT OR REPLACE INTO matches_meta BY NAME SELECT * FROM read_parquet(?, hive_partitioning = false)", [meta_glob])
+        n = con.execute("SELECT COUNT(*) FROM read_parquet(?, hive_partitioning = false)", [meta_glob]).fetchone()[0]
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return n
+
+# SQL query summarizing match coverage per season, including number of matches and participating teams.
+COVERAGE_SQL = """
+WITH seasons AS (
+  SELECT season, COUNT(*) AS matches
+  FROM matches_meta
+  GROUP BY season
+),
+teams_union AS (
+  SELECT season, team1 AS team FROM matches_meta
+  UNION ALL
+  SELECT season, team2 AS team FROM matches_meta
+),
+teams_agg AS (
+  SELECT season, STRING_AGG(DISTINCT team, ', ') AS teams_csv
+  FROM teams_union
+  GROUP BY season
+)
+SELECT s.season, s.matches, t.teams_csv AS teams
+FROM seasons s
+LEFT JOIN teams_agg t USING (season)
+ORDER BY s.season;
+"""
+
+# Derived lookup tables
+# Small pre-aggregated tables the API reads instead of rescanning matches_meta/deliveries.
+# IPL data is static between ingests, so they are simply rebuilt after every ingest.
+DERIVED_TABLES_SQL = [
+    # Per-season match counts and teams (printed by sanity)
+    "CREATE OR REPLACE TABLE coverage_by_season AS " + COVERAGE_SQL,
+    # match_id lookups for re-ingest DELETEs; created here, after loading, so a fresh bulk load skips index upkeep
+    "CREATE INDEX IF NOT EXISTS idx_del_mid ON deliveries(match_id)",
+    # Distinct teams per season (used by /debug/h2h)
+    """
+    CREATE OR REPLACE TABLE season_teams AS
+    SELECT season, team1 AS team FROM matches_meta
+    UNION
+    SELECT season, team2 AS team FROM matches_meta
+    """,
+    # Distinct batter/bowler names per season (used by /debug/player instead of ILIKE scans over deliveries)
+    """
+    CREATE OR REPLACE TABLE player_names AS
+    SELECT DISTINCT season, striker AS who, 'striker' AS role FROM deliveries
+    UNION
+    SELECT DISTINCT season, bowler AS who, 'bowler' AS role FROM deliveries
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_player_names_who ON player_names(who)",
+    # Per-season batting totals per striker (player_stats sums these across seasons for career scope)
+    """
+    CREATE OR REPLACE TABLE mv_player_season_batting AS
+    SELECT
+      season,
+      striker AS player,
+      COUNT(DISTINCT match_id) AS matches,
+      COUNT(DISTINCT (match_id, innings)) AS innings,
+      SUM(runs_batter) AS runs,
+      COUNT(*) AS balls,
+      COUNT(*) FILTER (WHERE runs_batter = 4) AS fours,
+      COUNT(*) FILTER (WHERE runs_batter = 6) AS sixes,
+      COUNT(player_dismissed) AS dismissals
+    FROM deliveries
+    GROUP BY season, striker
+    """,
+    # Per-season bowling totals per bowler
+    """
+    CREATE OR REPLACE TABLE mv_player_season_bowling AS
+    SELECT
+      season,
+      bowler AS player,
+      COUNT(DISTINCT match_id) AS matches,
+      COUNT(*) AS balls,
+      SUM(runs_total) AS runs_conceded,
+      COUNT(player_dismissed) AS wickets
+    FROM deliveries
+    GROUP BY season, bowler
+    """,
+    # Matches a player appeared in (batted or bowled) per season and team, with their latest appearance.
+    # (team_squad reads this.) The two narrow UNION scans beat a single scan unnesting [striker, bowler]
+    # pairs, which has to build a list per delivery.
+    """
+    CREATE OR REPLACE TABLE mv_player_team_season AS
+    WITH ap AS (
+      SELECT striker AS player, season, match_id, batting_team AS team FROM deliveries
+      UNION
+      SELECT bowler AS player, season, match_id, bowling_team AS team FROM deliveries
+    )
+    SELECT
+      ap.player, ap.season, ap.team,
+      COUNT(*) AS appearances,
+      first(m.date ORDER BY m.date DESC NULLS LAST, ap.match_id DESC) AS last_date,
+      first(ap.match_id ORDER BY m.date DESC NULLS LAST, ap.match_id DESC) AS last_match_id
+    FROM ap
+    LEFT JOIN matches_meta m USING (match_id)
+    WHERE ap.team IS NOT NULL
+    GROUP BY ap.player, ap.season, ap.team
+    """,
+    # Per-match batting and bowling figures (match_summary picks innings totals and top performers from these)
+    """
+    CREATE OR REPLACE TABLE mv_match_batting AS
+    SELECT
+      match_id,
+      innings,
+      striker AS batter,
+      SUM(runs_batter) AS runs,
+      COUNT(*) FILTER (WHERE is_legal) AS balls,
+      SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END) AS fours,
+      SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END) AS sixes
+    FROM deliveries
+    GROUP BY match_id, innings, striker
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_mv_match_batting_mid ON mv_match_batting(match_id)",
+    """
+    CREATE OR REPLACE TABLE mv_match_bowling AS
+    SELECT
+      match_id,
+      innings,
+      batting_team,
+      bowler,
+      COUNT(*) FILTER (WHERE is_legal) AS legal_balls,
+      SUM(runs_total) AS runs_conceded,
+      COUNT(player_dismissed) AS wickets
+    FROM deliveries
+    GROUP BY match_id, innings, batting_team, bowler
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_mv_match_bowling_mid ON mv_match_bowling(match_id)",
+    # Head-to-head results per season for each unordered team pair
+    """
+    CREATE OR REPLACE TABLE mv_h2h_season AS
+    SELECT
+      season,
+      LEAST(team1, team2) AS team_lo,
+      GREATEST(team1, team2) AS team_hi,
+      COUNT(*) AS matches,
+      COUNT(*) FILTER (WHERE winner = LEAST(team1, team2)) AS wins_lo,
+      COUNT(*) FILTER (WHERE winner = GREATEST(team1, team2)) AS wins_hi,
+      COUNT(*) FILTER (WHERE winner IS NULL) AS no_winner,
+      first(match_id ORDER BY date NULLS LAST, match_id) AS first_match_id,
+      first(date ORDER BY date NULLS LAST, match_id) AS first_date,
+      first(match_id ORDER BY date DESC NULLS FIRST, match_id DESC) AS last_match_id,
+      first(date ORDER BY date DESC NULLS FIRST, match_id DESC) AS last_date
+    FROM matches_meta
+    GROUP BY season, LEAST(team1, team2), GREATEST(team1, team2)
+    """,
+    # Per-season phase bowling totals (best_phase_bowlers). Phase is bucketed from the 0-based over
+    # here rather than read from deliveries.phase, so databases ingested before the bucket fix are corrected too.
+    """
+    CREATE OR REPLACE TABLE mv_phase_bowler_season AS
+    SELECT
+      CASE WHEN over IS NULL THEN NULL
+           WHEN over < 6 THEN 'PP'
+           WHEN over < 15 THEN 'Middle'
+           ELSE 'Death' END AS phase,
+      season,
+      bowler,
+      COUNT(*) FILTER (WHERE is_legal) AS legal_balls,
+      SUM(runs_total) AS runs_conceded,
+      COUNT(player_dismissed) AS wickets,
+      COUNT(DISTINCT match_id) AS matches,
+      SUM(CASE WHEN runs_total=0 AND player_dismissed IS NULL THEN 1 ELSE 0 END) AS dots,
+      SUM(CASE WHEN runs_batter IN (4,6) THEN 1 ELSE 0 END) AS boundaries
+    FROM deliveries
+    GROUP BY 1, season, bowler
+    """,
+]
+
+def build_derived_tables(con: duckdb.DuckDBPyConnection):
+    """
+    (Re)builds the derived lookup tables from matches_meta and deliveries.
+    """
+    ensure_tables(con)
+    for sql in DERIVED_TABLES_SQL:
+        con.execute(sql)
+    # Refresh the optimizer's distinct-value statistics for the freshly loaded and rebuilt tables
+    con.execute("ANALYZE")
+
+def find_pairs(folder: str):
+    """
+    Scans a directory for match_id.csv and match_id_info.csv pairs for bulk data ingestion.
+    """
+    pairs = []
+    with os.scandir(folder) as it:
+        for entry in it:
+            # <digits>_info.csv (suffix matched case-insensitively)
+            mid = entry.name[:-9]
+            if entry.name[-9:].lower() != "_info.csv" or not mid.isdecimal():
+                continue
+            deliveries_path = os.path.join(folder, f"{mid}.csv")
+            if os.path.exists(deliveries_path):
+                pairs.append((mid, deliveries_path, entry.path))
+            else:
+                print(f"[skip] Missing deliveries for {mid}: {deliveries_path}")
+    return pairs
+
+
+# Sanity Mode (one pair of match_id.csv and match_id_info.csv)
+
+def sanity(con: duckdb.DuckDBPyConnection):
+    """
+    Performs integrity checks: prints record counts, coverage summary, sample matches, and the deliveries table schema.
+    """
+    ensure_tables(con)
+    # counts total matches in the db
+    cnt_meta = con.execute("SELECT COUNT(*) FROM matches_meta").fetchone()[0]
+    cnt_delv = con.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
+    print(f"[sanity] matches_meta rows: {cnt_meta}")
+    print(f"[sanity] deliveries rows:   {cnt_delv}")
+
+    # show a few seasons + teams
+    try:
+        df_cov = con.execute("SELECT * FROM coverage_by_season ORDER BY season").df()
+        if not df_cov.empty:
+            print("\n[coverage by season]")
+            print(df_cov.to_string(index=False))
+        else:
+            print("\n[coverage by season] (no rows)")
+    except Exception as e:
+        print(f"[coverage] skipped due to error: {e}")
+
+    # peek five matches (head)
+    df_matches = con.execute("""
+        SELECT match_id, season, date, team1, team2, venue, player_of_match, winner
+        FROM matches_meta
+        ORDER BY date NULLS LAST, match_id
+        LIMIT 5
+    """).df()
+    print("\n[sample matches_meta]")
+    print(df_matches.to_string(index=False))
+
+    # columns present in deliveries
+    df_cols = con.execute("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = 'deliveries'
+        ORDER BY column_name
+    """).df()
+    print("\n[deliveries schema columns]")
+    print(df_cols.to_string(index=False))
+
+
+# CLI
+
+#Entry point handling CLI arguments for bulk ingestion, single match ingestion, or running database sanity checks.
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default="ipl_data.duckdb", help="DuckDB file path")
+    ap.add_argument("--folder", help="Folder with <id>.csv and <id>_info.csv for BULK INGEST")
+    ap.add_argument("--match", help="Path to <id>.csv for SINGLE-PAIR INGEST")
+    ap.add_argument("--info",  help="Path to <id>_info.csv for SINGLE-PAIR INGEST")
+    ap.add_argument("--cache-parquet", metavar="DIR", help="Also write the ingested matches to a Parquet cache in DIR")
+    ap.add_argument("--from-parquet", metavar="DIR", help="Load matches from a Parquet cache written by --cache-parquet")
+    args = ap.parse_args()
+
+    con = duckdb.connect(args.db)
+
+    # Mode selection
+    if args.from_parquet:
+        # PARQUET RE-INGEST
+        n = load_parquet(con, args.from_parquet)
+        print(f"[parquet] Loaded {n} matches from {args.from_parquet}")
+        build_derived_tables(con)
+        sanity(con)
+        con.close()
+        return
+
+    if args.folder:
+        # BULK INGEST
+        pairs = find_pairs(args.folder)
+        if not pairs:
+            print("[bulk] No pairs found. Check --folder path.")
+            sanity(con)
+            con.close()
+            sys.exit(1)
+        # Row order inside deliveries carries no meaning, so let DuckDB insert in parallel
+        con.execute("SET preserve_insertion_order = false")
+        ok = fail = 0
+        matches = []
+        # Info files are plain-Python parsing, so spread them over worker processes; DuckDB stays in this process
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            parsed = pool.map(parse_pair_info, sorted(pairs, key=lambda x: int(x[0])), chunksize=64)
+            for mid, deliveries_path, meta, err in parsed:
+                if err is not None:
+                    fail += 1
+                    print(f"[fail] {mid}: {err}")
+                    continue
+                matches.append((mid, deliveries_path, meta))
+        try:
+            upsert_matches_csv(con, matches)
+            ok = len(matches)
+        except Exception as e:
+            # One bad deliveries file fails the whole statement; redo match by match to isolate it
+            print(f"[bulk] Single-statement load failed ({e}); retrying per match...")
+            ok, failed = upsert_matches_each(con, matches)
+            fail += failed
+        print(f"\n[bulk] Success: {ok}  Failed: {fail}  Total: {ok+fail}")
+        if args.cache_parquet:
+            export_parquet(con, args.cache_parquet, [mid for mid, _, _ in matches])
+        build_derived_tables(con)
+        sanity(con)
+        con.close()
+        return
+
+    if args.match and args.info:
+        # SINGLE-PAIR INGEST
+        deliveries = parse_deliveries_csv(args.match)
+        meta = parse_info_csv(args.info)
+        meta["season"] = normalize_season(meta.get("season"))
+        match_id = first_match_id(deliveries)
+        if match_id is not None:
+            meta["match_id"] = match_id
+        upsert_match(con, deliveries, meta)
+        print("[pair] Ingested one match.")
+        if args.cache_parquet:
+            export_parquet(con, args.cache_parquet, [first_match_id(deliveries)])
+        build_derived_tables(con)
+        sanity(con)
+        con.close()
+        return
+
+    # SANITY-ONLY (no folder, no match/info)
+    print("[sanity-only] Connecting to DB and inspecting…")
+    build_derived_tables(con)
+    sanity(con)
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
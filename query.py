@@ -4,13 +4,129 @@
 """
 
 import duckdb
-import pandas as pd
-import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import copy
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# One read-only connection per database file, opened on first use and kept for the life of the process,
+# so repeated calls skip reopening the file and keep DuckDB's buffer cache warm
+_CON_CACHE = {}
+_CON_LOCK = threading.Lock()
+
+def get_connection(db_path):
+    """
+    Return a DuckDB cursor for a file path (on the shared cached connection for that file),
+    or pass through an already-open connection/cursor.
+    """
+    if isinstance(db_path, duckdb.DuckDBPyConnection):
+        return db_path
+    with _CON_LOCK:
+        con = _CON_CACHE.get(db_path)
+        if con is None:
+            con = _CON_CACHE[db_path] = duckdb.connect(db_path, read_only=True)
+    # Own cursor per call, as one connection must not run queries from several threads at once
+    return con.cursor()
+
+def close_connection(db_path=None):
+    """
+    Close the cached connection for db_path (or all of them) and drop its cached query results,
+    releasing DuckDB's file lock so the database can be reopened read-write (e.g. to re-ingest).
+    """
+    with _CON_LOCK:
+        if db_path is None:
+            cons = list(_CON_CACHE.values())
+            _CON_CACHE.clear()
+        else:
+            con = _CON_CACHE.pop(db_path, None)
+            cons = [con] if con is not None else []
+    for con in cons:
+        con.close()
+    with _RESULT_LOCK:
+        for key in [k for k in _RESULT_CACHE if db_path is None or k[1] == db_path]:
+            del _RESULT_CACHE[key]
+
+def submit_query(con, executor, sql, params=None, fetch="to_arrow_table"):
+    """
+    Start a query and return a Future holding its fetched result.
+    With an executor the query runs on its own sibling cursor so independent queries overlap; without one it runs inline.
+    """
+    if executor is None:
+        fut = Future()
+        fut.set_result(getattr(con.execute(sql, params or []), fetch)())
+        return fut
+
+    def _run():
+        cur = con.cursor()
+        try:
+            return getattr(cur.execute(sql, params or []), fetch)()
+        finally:
+            cur.close()
+
+    return executor.submit(_run)
+
+
+def fetch_records(cur):
+    """Fetch the pending result as a list of row dicts via Arrow (one columnar copy, no DataFrame)."""
+    return cur.to_arrow_table().to_pylist()
+
+
+# Results of the query functions for file-path callers, keyed on (function, path, args).
+# The data is static between ingests, so entries only need an LRU bound; callers passing a
+# connection/cursor bypass it since that object says nothing about which database it reads.
+RESULT_CACHE_MAX = 512
+_RESULT_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+_RESULT_LOCK = threading.Lock()
+
+def set_cache_size(n):
+    """Bound the query result cache to n entries (0 disables it), evicting the oldest ones past it."""
+    global RESULT_CACHE_MAX
+    with _RESULT_LOCK:
+        RESULT_CACHE_MAX = max(0, int(n))
+        while len(_RESULT_CACHE) > RESULT_CACHE_MAX:
+            _RESULT_CACHE.popitem(last=False)
+
+def cached_result(func):
+    """Memoize a query function on (db path, args); each caller gets its own copy of the cached dict."""
+    @functools.wraps(func)
+    def wrapper(db_path, *args, **kwargs):
+        if not isinstance(db_path, str) or RESULT_CACHE_MAX <= 0:
+            return func(db_path, *args, **kwargs)
+        # The executor only changes how the queries are run, not the result
+        key_kwargs = tuple(sorted((k, v) for k, v in kwargs.items() if k != "executor"))
+        key = (func.__name__, db_path, args, key_kwargs)
+        try:
+            with _RESULT_LOCK:
+                hit = _RESULT_CACHE.get(key)
+                if hit is not None:
+                    _RESULT_CACHE.move_to_end(key)
+        except TypeError:
+            # Unhashable arguments: just run the query
+            return func(db_path, *args, **kwargs)
+        if hit is not None:
+            return copy.deepcopy(hit)
+
+        result = func(db_path, *args, **kwargs)
+        with _RESULT_LOCK:
+            _RESULT_CACHE[key] = copy.deepcopy(result)
+            while len(_RESULT_CACHE) > RESULT_CACHE_MAX:
+                _RESULT_CACHE.popitem(last=False)
+        return result
+    return wrapper
+
 
 #Functions used to calculate the queries' many ground levels
+def _missing(x):
+    """None or NaN (NaN is the only value not equal to itself); values come from Arrow, so no pd.NA."""
+    return x is None or x != x
+
 def safe_int(x, default=0):
-    """Convert to int safely, treating pd.NA / NaN / None as default."""
-    if pd.isna(x):
+    """Convert to int safely, treating None / NaN as default."""
+    if _missing(x):
         return default
     try:
         return int(x)
@@ -18,8 +134,8 @@ def safe_int(x, default=0):
         return default
 
 def safe_float(x, default=0.0):
-    """Convert to float safely, treating pd.NA / NaN / None as default."""
-    if pd.isna(x):
+    """Convert to float safely, treating None / NaN as default."""
+    if _missing(x):
         return default
     try:
         return float(x)
@@ -27,35 +143,31 @@ def safe_float(x, default=0.0):
         return default
 
 def safe_div(n, d, scale=1.0):
-    """Safe division with NaN/0 protection."""
-    if d in (0, None) or pd.isna(d):
-        return None
-    try:
-        return round((n * scale) / d, 2)
-    except Exception:
+    """Safe division with None/NaN/0 protection (callers pass numbers, already defaulted by safe_int)."""
+    if not d or d != d:
         return None
+    return round((n * scale) / d, 2)
 
 def safe_mean(values):
-    """Safe mean ignoring NaN/None."""
-    vals = [v for v in values if not pd.isna(v)]
-    return round(sum(vals) / len(vals), 2) if vals else None
-
+    """Safe mean ignoring NaN/None, computed by Arrow over the whole array."""
+    mean = pc.mean(pa.array(values, from_pandas=True)).as_py()
+    return None if mean is None else round(mean, 2)
 
 #Query functions 
 
-def match_summary(db_path, team_a, team_b, season, nth=1):
+@cached_result
+def match_summary(db_path, team_a, team_b, season, nth=1, executor=None):
     """
     Rich match summary for the nth meeting of two teams in a season.
     - Innings: runs/wkts/overs, RR
     - Top batters: 2 per innings (runs, balls, 4s/6s, SR)
     - Top bowlers: 2 per innings (wkts, runs conceded, overs, Econ)
     """
-    import pandas as pd
-    import duckdb
-    con = duckdb.connect(db_path)
+    con = get_connection(db_path)
 
-    # Pick the nth match (2 matches in a season by default most fo the times, more if met in playoffs)
-    meta = con.execute(f"""
+    # Pick the nth match (2 matches in a season by default most fo the times, more if met in playoffs);
+    # asking past the last meeting gives the last one. Only that single row is fetched.
+    cur = con.execute("""
         SELECT match_id, season, date, venue, team1, team2, winner, player_of_match
         FROM matches_meta
         WHERE season = ?
@@ -63,142 +175,81 @@ def match_summary(db_path, team_a, team_b, season, nth=1):
                 (team1 = ? AND team2 = ?) OR
                 (team1 = ? AND team2 = ?)
               )
-        ORDER BY date NULLS LAST, match_id
-        LIMIT {nth}
-    """, [season, team_a, team_b, team_b, team_a]).df()
-    if meta.empty:
+        QUALIFY ROW_NUMBER() OVER (ORDER BY date NULLS LAST, match_id) = LEAST(?, COUNT(*) OVER ())
+    """, [season, team_a, team_b, team_b, team_a, int(nth)])
+    row = cur.fetchone()
+    if row is None:
         return {"error": f"No match found between {team_a} and {team_b} in {season}"}
 
-    m = meta.iloc[-1].to_dict()
+    m = dict(zip([d[0] for d in cur.description], row))
     match_id = int(m["match_id"])
 
-    # Innings summary (legal balls; RR = runs*6 / legal_balls)
-    inn = con.execute("""
+    # Innings summary (legal balls; RR = runs*6 / legal_balls), summed over the per-match bowling figures
+    # Each query returns rows already shaped (names, types, defaults) as the payload entries;
+    # the three are independent, so they overlap when an executor is given
+    innings_job = submit_query(con, executor, """
         WITH base AS (
           SELECT
             innings,
             batting_team,
-            SUM(runs_total) AS runs,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls,
-            COUNT(CASE WHEN player_dismissed IS NOT NULL THEN 1 END) AS wickets
-          FROM deliveries
+            SUM(runs_conceded) AS runs,
+            SUM(legal_balls) AS legal_balls,
+            SUM(wickets) AS wickets
+          FROM mv_match_bowling
           WHERE match_id = ?
           GROUP BY innings, batting_team
         )
         SELECT
-          innings,
+          innings::INTEGER AS innings,
           batting_team,
-          runs::INTEGER AS runs,
-          wickets::INTEGER AS wickets,
-          legal_balls::INTEGER AS legal_balls,
-          (legal_balls / 6) || '.' || (legal_balls % 6) AS overs_str,
-          ROUND((runs * 6.0) / NULLIF(legal_balls, 0), 2) AS run_rate
+          COALESCE(runs, 0)::INTEGER AS runs,
+          COALESCE(wickets, 0)::INTEGER AS wickets,
+          (legal_balls / 6) || '.' || (legal_balls % 6) AS overs,
+          ROUND((runs * 6.0) / NULLIF(legal_balls, 0), 2)::DOUBLE AS run_rate
         FROM base
         ORDER BY innings
-    """, [match_id]).df()
+    """, [match_id])
 
     # Get the top 2 batters per innings
-    top_batters = con.execute("""
-        WITH bat AS (
-          SELECT
-            innings,
-            striker AS batter,
-            SUM(runs_batter) AS runs,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS balls,
-            SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END) AS fours,
-            SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END) AS sixes
-          FROM deliveries
-          WHERE match_id = ?
-          GROUP BY innings, striker
-        ),
-        ranked AS (
-          SELECT
-            innings,
-            batter,
-            runs::INTEGER AS runs,
-            balls::INTEGER AS balls,
-            fours::INTEGER AS fours,
-            sixes::INTEGER AS sixes,
-            ROUND((runs * 100.0) / NULLIF(balls, 0), 2) AS strike_rate,
-            ROW_NUMBER() OVER (
-              PARTITION BY innings
-              ORDER BY runs DESC, strike_rate DESC NULLS LAST, balls ASC, batter ASC
-            ) AS rk
-          FROM bat
-        )
-        SELECT innings, batter, runs, balls, fours, sixes, strike_rate
-        FROM ranked
-        WHERE rk <= 2
-        ORDER BY innings, rk
-    """, [match_id]).df()
+    top_batters_job = submit_query(con, executor, """
+        SELECT
+          innings::INTEGER AS innings,
+          batter,
+          COALESCE(runs, 0)::INTEGER AS runs,
+          COALESCE(balls, 0)::INTEGER AS balls,
+          COALESCE(fours, 0)::INTEGER AS fours,
+          COALESCE(sixes, 0)::INTEGER AS sixes,
+          ROUND((runs * 100.0) / NULLIF(balls, 0), 2)::DOUBLE AS strike_rate
+        FROM mv_match_batting
+        WHERE match_id = ?
+        QUALIFY ROW_NUMBER() OVER (
+          PARTITION BY innings
+          ORDER BY runs DESC, strike_rate DESC NULLS LAST, balls ASC, batter ASC
+        ) <= 2
+        ORDER BY innings, runs DESC, strike_rate DESC NULLS LAST, balls ASC, batter ASC
+    """, [match_id])
 
     # Get the top 2 bowlers per innings
-    top_bowlers = con.execute("""
-        WITH bowl AS (
-          SELECT
-            innings,
-            bowler,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls,
-            SUM(runs_total) AS runs_conceded,
-            COUNT(CASE WHEN player_dismissed IS NOT NULL THEN 1 END) AS wickets
-          FROM deliveries
-          WHERE match_id = ?
-          GROUP BY innings, bowler
-        ),
-        ranked AS (
-          SELECT
-            innings,
-            bowler,
-            wickets::INTEGER AS wickets,
-            runs_conceded::INTEGER AS runs_conceded,
-            (legal_balls / 6) || '.' || (legal_balls % 6) AS overs,
-            ROUND((runs_conceded * 6.0) / NULLIF(legal_balls, 0), 2) AS economy,
-            ROW_NUMBER() OVER (
-              PARTITION BY innings
-              ORDER BY wickets DESC, economy ASC NULLS LAST, runs_conceded ASC, bowler ASC
-            ) AS rk
-          FROM bowl
-        )
-        SELECT innings, bowler, wickets, runs_conceded, overs, economy
-        FROM ranked
-        WHERE rk <= 2
-        ORDER BY innings, rk
-    """, [match_id]).df()
-
-    # Build payload
-    innings_payload = []
-    for _, r in inn.iterrows():
-        innings_payload.append({
-            "innings": int(r["innings"]),
-            "batting_team": r["batting_team"],
-            "runs": int(r["runs"]) if not pd.isna(r["runs"]) else 0,
-            "wickets": int(r["wickets"]) if not pd.isna(r["wickets"]) else 0,
-            "overs": r["overs_str"] if r.get("overs_str", None) is not None else None,
-            "run_rate": None if pd.isna(r["run_rate"]) else float(r["run_rate"]),
-        })
-
-    top_batters_payload = []
-    for _, r in top_batters.iterrows():
-        top_batters_payload.append({
-            "innings": int(r["innings"]),
-            "batter": r["batter"],
-            "runs": int(r["runs"]) if not pd.isna(r["runs"]) else 0,
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "fours": int(r["fours"]) if not pd.isna(r["fours"]) else 0,
-            "sixes": int(r["sixes"]) if not pd.isna(r["sixes"]) else 0,
-            "strike_rate": None if pd.isna(r["strike_rate"]) else float(r["strike_rate"]),
-        })
-
-    top_bowlers_payload = []
-    for _, r in top_bowlers.iterrows():
-        top_bowlers_payload.append({
-            "innings": int(r["innings"]),
-            "bowler": r["bowler"],
-            "wickets": int(r["wickets"]) if not pd.isna(r["wickets"]) else 0,
-            "runs_conceded": int(r["runs_conceded"]) if not pd.isna(r["runs_conceded"]) else 0,
-            "overs": r["overs"],
-            "economy": None if pd.isna(r["economy"]) else float(r["economy"]),
-        })
+    top_bowlers_job = submit_query(con, executor, """
+        SELECT
+          innings::INTEGER AS innings,
+          bowler,
+          COALESCE(wickets, 0)::INTEGER AS wickets,
+          COALESCE(runs_conceded, 0)::INTEGER AS runs_conceded,
+          (legal_balls / 6) || '.' || (legal_balls % 6) AS overs,
+          ROUND((runs_conceded * 6.0) / NULLIF(legal_balls, 0), 2)::DOUBLE AS economy
+        FROM mv_match_bowling
+        WHERE match_id = ?
+        QUALIFY ROW_NUMBER() OVER (
+          PARTITION BY innings
+          ORDER BY wickets DESC, economy ASC NULLS LAST, runs_conceded ASC, bowler ASC
+        ) <= 2
+        ORDER BY innings, wickets DESC, economy ASC NULLS LAST, runs_conceded ASC, bowler ASC
+    """, [match_id])
+
+    innings_payload = innings_job.result().to_pylist()
+    top_batters_payload = top_batters_job.result().to_pylist()
+    top_bowlers_payload = top_bowlers_job.result().to_pylist()
 
     # Formatter convenience
     m["teams"] = [m.get("team1"), m.get("team2")]
@@ -212,123 +263,63 @@ def match_summary(db_path, team_a, team_b, season, nth=1):
     }
 
 
-def player_stats(db_path, player, scope="career", season=None):
+@cached_result
+def player_stats(db_path, player, scope="career", season=None, executor=None):
     """Aggregate batting & bowling stats for a player with all teams/last team and best matchup against which bowler and batter."""
-    con = duckdb.connect(db_path)
+    con = get_connection(db_path)
 
     # Base filter selecting season or career
-    where = f"(striker = ? OR bowler = ?)"
-    params = [player, player]
-    if scope == "season" and season:
-        where += " AND season = ?"
-        params.append(season)
-
-    df = con.execute(f"SELECT * FROM deliveries WHERE {where}", params).df()
-    if df.empty:
-        return {"error": f"No data found for player {player}"}
-
-    # Batting aggregates
-    bat_df = df[df["striker"] == player]
-    runs = safe_int(bat_df["runs_batter"].sum())
-    balls = safe_int(len(bat_df))
-    fours = safe_int((bat_df["runs_batter"] == 4).sum())
-    sixes = safe_int((bat_df["runs_batter"] == 6).sum())
-    dismissals = safe_int(bat_df["player_dismissed"].notna().sum())
-    sr = safe_div(runs, balls, 100)
-    avg = safe_div(runs, dismissals, 1.0)
-
-    batting = {
-        "matches": safe_int(df["match_id"].nunique()),
-        "inns": safe_int(bat_df["innings"].nunique()),
-        "runs": runs,
-        "balls": balls,
-        "fours": fours,
-        "sixes": sixes,
-        "sr": sr,
-        "average": avg,
-    }
-
-    # Bowling aggregates
-    bowl_df = df[df["bowler"] == player]
-    balls_bowled = safe_int(len(bowl_df))
-    runs_conceded = safe_int(bowl_df["runs_total"].sum())
-    wickets = safe_int(bowl_df["player_dismissed"].notna().sum())
-    economy = safe_div(runs_conceded, balls_bowled / 6.0, 1.0)
-
-    bowling = {
-        "matches": safe_int(bowl_df["match_id"].nunique()),
-        "overs": safe_div(balls_bowled, 6.0, 1.0),
-        "wickets": wickets,
-        "runs_conceded": runs_conceded,
-        "economy": economy,
-    }
+    season_filter = " AND season = ?" if (scope == "season" and season) else ""
+    season_args = [season] if (scope == "season" and season) else []
 
-    # Teams represented throughout career
-    teams_df = con.execute(
-        """
-        WITH appearances AS (
-          SELECT DISTINCT match_id,
-                 CASE WHEN striker = ? THEN batting_team END AS team_a,
-                 CASE WHEN bowler  = ? THEN bowling_team END AS team_b
-          FROM deliveries
-          WHERE striker = ? OR bowler = ?
+    # Independent queries: start them all up front so they can overlap when an executor is given
+    # Batting/bowling totals come from the per-season tables built at ingest (career = sum over seasons),
+    # together with every team represented and the latest appearance (for last team), always career-wide
+    totals_job = submit_query(
+        con, executor,
+        f"""
+        WITH career AS (
+          SELECT
+            list(DISTINCT team) AS teams,
+            first(team ORDER BY last_date DESC NULLS LAST, last_match_id DESC) AS last_team,
+            first(last_match_id ORDER BY last_date DESC NULLS LAST, last_match_id DESC) AS last_match_id,
+            first(last_date ORDER BY last_date DESC NULLS LAST, last_match_id DESC) AS last_date
+          FROM mv_player_team_season WHERE player = ?
         ),
-        teams AS (
-          SELECT team_a AS team FROM appearances WHERE team_a IS NOT NULL
-          UNION
-          SELECT team_b AS team FROM appearances WHERE team_b IS NOT NULL
-        )
-        SELECT DISTINCT team FROM teams WHERE team IS NOT NULL ORDER BY team
-        """,
-        [player, player, player, player],
-    ).df()
-    teams = sorted([t for t in teams_df["team"].tolist() if t])
-
-    # Last team played for (calculated using latest match appearance) 
-    last_df = con.execute(
-        """
-        WITH ap AS (
-          SELECT d.match_id, m.date,
-                 CASE
-                   WHEN d.striker = ? THEN d.batting_team
-                   WHEN d.bowler  = ? THEN d.bowling_team
-                 END AS team
-          FROM deliveries d
-          JOIN matches_meta m USING (match_id)
-          WHERE d.striker = ? OR d.bowler = ?
+        apps AS (
+          SELECT SUM(appearances) AS matches
+          FROM mv_player_team_season WHERE player = ? {season_filter}
+        ),
+        bat AS (
+          SELECT SUM(innings) AS inns, SUM(runs) AS runs, SUM(balls) AS balls,
+                 SUM(fours) AS fours, SUM(sixes) AS sixes, SUM(dismissals) AS dismissals
+          FROM mv_player_season_batting WHERE player = ? {season_filter}
         ),
-        ranked AS (
-          SELECT *, ROW_NUMBER() OVER (ORDER BY date DESC NULLS LAST, match_id DESC) AS rk
-          FROM ap
-          WHERE team IS NOT NULL
+        bowl AS (
+          SELECT SUM(matches) AS matches, SUM(balls) AS balls,
+                 SUM(runs_conceded) AS runs_conceded, SUM(wickets) AS wickets
+          FROM mv_player_season_bowling WHERE player = ? {season_filter}
         )
-        SELECT match_id, date, team
-        FROM ranked
-        WHERE rk = 1
+        SELECT apps.matches,
+               bat.inns, bat.runs, bat.balls, bat.fours, bat.sixes, bat.dismissals,
+               bowl.matches AS bowl_matches, bowl.balls AS bowl_balls,
+               bowl.runs_conceded, bowl.wickets,
+               career.teams, career.last_team, career.last_match_id, career.last_date
+        FROM apps, bat, bowl, career
         """,
-        [player, player, player, player],
-    ).df()
+        [player] + [player] + season_args + [player] + season_args + [player] + season_args,
+        fetch="fetchone",
+    )
 
-    last_team = None
-    if not last_df.empty:
-        r = last_df.iloc[0]
-        last_team = {
-            "team": r["team"],
-            "match_id": int(r["match_id"]) if not pd.isna(r["match_id"]) else None,
-            "date": str(r["date"]) if not pd.isna(r["date"]) else None,
-        }
-
-    
-    # Matchups (Batting)
-
-    # Nemesis bowler (most dismissals of this batter)
-    nemesis = con.execute(
+    # Matchups (Batting): nemesis and favourite bowler
+    nemesis_job = submit_query(
+        con, executor,
         """
         WITH agg AS (
           SELECT
             bowler,
             COUNT(CASE WHEN player_dismissed = ? THEN 1 END) AS outs,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls_vs,
+            COUNT(*) FILTER (WHERE is_legal) AS legal_balls_vs,
             SUM(runs_total) AS runs_vs
           FROM deliveries
           WHERE striker = ?
@@ -345,25 +336,16 @@ def player_stats(db_path, player, scope="career", season=None):
         LIMIT 1
         """,
         [player, player],
-    ).df()
+        fetch="fetchone",
+    )
 
-    nemesis_bowler = None
-    if not nemesis.empty:
-        r = nemesis.iloc[0]
-        nemesis_bowler = {
-            "bowler": r["bowler"],
-            "outs": int(r["outs"]) if not pd.isna(r["outs"]) else 0,
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "economy_against": None if pd.isna(r["econ_vs"]) else float(r["econ_vs"]),
-        }
-
-    # Favourite bowler (highest economy conceded to this batter (min 10 overs = 60 balls))
-    fav = con.execute(
+    fav_job = submit_query(
+        con, executor,
         """
         WITH agg AS (
           SELECT
             bowler,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls_vs,
+            COUNT(*) FILTER (WHERE is_legal) AS legal_balls_vs,
             SUM(runs_total) AS runs_vs
           FROM deliveries
           WHERE striker = ?
@@ -379,29 +361,18 @@ def player_stats(db_path, player, scope="career", season=None):
         LIMIT 1
         """,
         [player],
-    ).df()
-
-    favourite_bowler = None
-    if not fav.empty:
-        r = fav.iloc[0]
-        favourite_bowler = {
-            "bowler": r["bowler"],
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "economy": None if pd.isna(r["economy"]) else float(r["economy"]),
-        }
+        fetch="fetchone",
+    )
 
-    
-    #Matchup (Bowling)
-    
-
-    # Bunny Batter (dismissed most by this bowler)
-    bunny = con.execute(
+    # Matchups (Bowling): bunny batter and worst economy vs a batter
+    bunny_job = submit_query(
+        con, executor,
         """
         WITH agg AS (
           SELECT
             striker AS batter,
             COUNT(CASE WHEN player_dismissed = striker THEN 1 END) AS outs,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls_vs,
+            COUNT(*) FILTER (WHERE is_legal) AS legal_balls_vs,
             SUM(runs_total) AS runs_vs
           FROM deliveries
           WHERE bowler = ?
@@ -418,25 +389,16 @@ def player_stats(db_path, player, scope="career", season=None):
         LIMIT 1
         """,
         [player],
-    ).df()
+        fetch="fetchone",
+    )
 
-    most_dismissed_batter = None
-    if not bunny.empty:
-        r = bunny.iloc[0]
-        most_dismissed_batter = {
-            "batter": r["batter"],
-            "outs": int(r["outs"]) if not pd.isna(r["outs"]) else 0,
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "economy_against": None if pd.isna(r["econ_vs"]) else float(r["econ_vs"]),
-        }
-
-    # Worst economy vs a batter (min 10 overs bowled to that batter)
-    worst = con.execute(
+    worst_job = submit_query(
+        con, executor,
         """
         WITH agg AS (
           SELECT
             striker AS batter,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls_vs,
+            COUNT(*) FILTER (WHERE is_legal) AS legal_balls_vs,
             SUM(runs_total) AS runs_vs
           FROM deliveries
           WHERE bowler = ?
@@ -452,15 +414,114 @@ def player_stats(db_path, player, scope="career", season=None):
         LIMIT 1
         """,
         [player],
-    ).df()
+        fetch="fetchone",
+    )
+
+    (matches, inns, runs, balls, fours, sixes, dismissals,
+     bowl_matches, balls_bowled, runs_conceded, wickets,
+     team_list, last_team_name, last_match_id, last_date) = totals_job.result()
+    if not matches:
+        return {"error": f"No data found for player {player}"}
+
+    # Batting aggregates
+    runs = safe_int(runs)
+    balls = safe_int(balls)
+    dismissals = safe_int(dismissals)
+    sr = safe_div(runs, balls, 100)
+    avg = safe_div(runs, dismissals, 1.0)
+
+    batting = {
+        "matches": safe_int(matches),
+        "inns": safe_int(inns),
+        "runs": runs,
+        "balls": balls,
+        "fours": safe_int(fours),
+        "sixes": safe_int(sixes),
+        "sr": sr,
+        "average": avg,
+    }
+
+    # Bowling aggregates
+    balls_bowled = safe_int(balls_bowled)
+    runs_conceded = safe_int(runs_conceded)
+    wickets = safe_int(wickets)
+    economy = safe_div(runs_conceded, balls_bowled / 6.0, 1.0)
+
+    bowling = {
+        "matches": safe_int(bowl_matches),
+        "overs": safe_div(balls_bowled, 6.0, 1.0),
+        "wickets": wickets,
+        "runs_conceded": runs_conceded,
+        "economy": economy,
+    }
+
+    # Teams represented throughout career
+    teams = sorted([t for t in (team_list or []) if t])
+
+    # Last team played for (calculated using latest match appearance) 
+    last_team = None
+    if team_list:
+        last_team = {
+            "team": last_team_name,
+            "match_id": int(last_match_id) if last_match_id is not None else None,
+            "date": str(last_date) if last_date is not None else None,
+        }
+
+    
+    # Matchups (Batting)
+
+    # Nemesis bowler (most dismissals of this batter); each matchup query returns at most one row
+    nemesis = nemesis_job.result()
+
+    nemesis_bowler = None
+    if nemesis:
+        bowler, outs, balls_vs, econ_vs = nemesis
+        nemesis_bowler = {
+            "bowler": bowler,
+            "outs": safe_int(outs),
+            "balls": safe_int(balls_vs),
+            "economy_against": None if econ_vs is None else float(econ_vs),
+        }
+
+    # Favourite bowler (highest economy conceded to this batter (min 10 overs = 60 balls))
+    fav = fav_job.result()
+
+    favourite_bowler = None
+    if fav:
+        bowler, balls_vs, econ = fav
+        favourite_bowler = {
+            "bowler": bowler,
+            "balls": safe_int(balls_vs),
+            "economy": None if econ is None else float(econ),
+        }
+
+    
+    #Matchup (Bowling)
+    
+
+    # Bunny Batter (dismissed most by this bowler)
+    bunny = bunny_job.result()
+
+    most_dismissed_batter = None
+    if bunny:
+        batter, outs, balls_vs, econ_vs = bunny
+        most_dismissed_batter = {
+            "batter": batter,
+            "outs": safe_int(outs),
+            "balls": safe_int(balls_vs),
+            "economy_against": None if econ_vs is None else float(econ_vs),
+        }
+
+    # Worst economy vs a batter (min 10 overs bowled to that batter)
+    worst = worst_job.result()
 
     worst_vs_batter = None
-    if not worst.empty:
-        r = worst.iloc[0]
+    if worst:
+        batter, balls_vs, econ = worst
         worst_vs_batter = {
-            "batter": r["batter"],
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "economy": None if pd.isna(r["economy"]) else float(r["economy"]),
+            "batter": batter,
+            "balls": safe_int(balls_vs),
+            "economy": None if econ is None else float(econ),
         }
 
     return {
@@ -482,78 +543,47 @@ def player_stats(db_path, player, scope="career", season=None):
     }
 
 
+@cached_result
 def team_squad(db_path, team, season):
     """Get the squad for any team for a particular season"""
-    con = duckdb.connect(db_path)
+    con = get_connection(db_path)
 
-    # Try to read listed squad from matches_meta 
-    q_json = """
-        WITH base AS (
-          SELECT players_map_json
+    # Listed squad from matches_meta, parsed by DuckDB's JSON functions (players_map_json is {team: [players]})
+    q_listed = """
+        WITH lists AS (
+          SELECT json_extract(players_map_json, '$."' || ? || '"') AS players
           FROM matches_meta
           WHERE season = ? AND (team1 = ? OR team2 = ?)
         )
-        SELECT DISTINCT CAST(j.value AS VARCHAR) AS players_json
-        FROM base, json_each(base.players_map_json) AS j
-        WHERE j.key = ?
+        SELECT DISTINCT UNNEST(
+          CASE WHEN json_type(players) = 'ARRAY' THEN players::VARCHAR[]
+               ELSE [json_extract_string(players, '$')] END
+        ) AS player
+        FROM lists
+        WHERE players IS NOT NULL
     """
-    df_json = con.execute(q_json, [season, team, team, team]).df()
-
-    listed = set()
-    if not df_json.empty:
-        for _, row in df_json.iterrows():
-            val = row.get("players_json")
-            if pd.isna(val) or not val:
-                continue
-            s = str(val).strip()
-            if s.lower() == "null":
-                continue
-            parsed = None
-            try:
-                parsed = json.loads(s)
-            except Exception:
-                try:
-                    parsed = json.loads(s.replace("'", '"'))
-                except Exception:
-                    if s.startswith("[") and s.endswith("]"):
-                        inner = s[1:-1].strip().replace("'", "").replace('"', "")
-                        parsed = [p.strip() for p in inner.split(",") if p.strip()]
-            if isinstance(parsed, list):
-                listed.update([p for p in parsed if p])
-            elif isinstance(parsed, str) and parsed:
-                listed.add(parsed)
-
-    # Number of actual appearances from deliveries
+    listed = {
+        p for p in con.execute(q_listed, [team, season, team, team]).to_arrow_table().column("player").to_pylist()
+        if p
+    }
+
+    # Number of actual appearances (batted or bowled for the team), pre-aggregated at ingest
     q_apps = """
-        WITH ap AS (
-            -- one row per (match, player) when he batted for the team
-            SELECT DISTINCT match_id, striker AS player
-            FROM deliveries
-            WHERE season = ? AND batting_team = ? AND striker IS NOT NULL
-
-            UNION
-
-            -- one row per (match, player) when he bowled for the team
-            SELECT DISTINCT match_id, bowler AS player
-            FROM deliveries
-            WHERE season = ? AND bowling_team = ? AND bowler IS NOT NULL
-        )
-        SELECT player, COUNT(DISTINCT match_id) AS matches
-        FROM ap
-        WHERE player IS NOT NULL
-        GROUP BY player
+        SELECT player, appearances AS matches
+        FROM mv_player_team_season
+        WHERE season = ? AND team = ? AND player IS NOT NULL
         ORDER BY matches DESC, player
     """
-    df_apps = con.execute(q_apps, [season, team, season, team]).df()
+    apps = fetch_records(con.execute(q_apps, [season, team]))
 
     # Players who actually appeared
-    appeared = set(df_apps["player"].tolist()) if not df_apps.empty else set()
+    appeared = {row["player"] for row in apps}
 
     # Union of sources i.e., everyone who appeared + anyone listed in match_id_info.csv
     all_players = sorted(appeared.union(listed))
 
     # Build appearances map
-    app_map = {row["player"]: int(row["matches"]) for _, row in df_apps.iterrows()} if not df_apps.empty else {}
+    app_map = {row["player"]: int(row["matches"]) for row in apps}
     squad = [{"player": p, "appearances": app_map.get(p, 0 if p in listed else None)} for p in all_players]
 
     # If absolutely nothing found, return error
@@ -562,25 +592,30 @@ def team_squad(db_path, team, season):
 
     return {"input": {"team": team, "season": season}, "squad": squad}
 
+@cached_result
 def player_vs_team(db_path, player, opponent, scope="career", season=None):
     """Stats of a particular player against a team during a particular season or throughout their career"""
-    con = duckdb.connect(db_path)
-    where = f"WHERE (striker = '{player}' OR bowler = '{player}')"
-    where += f" AND (batting_team = '{opponent}' OR bowling_team = '{opponent}')"
+    con = get_connection(db_path)
+    where = "WHERE (striker = ? OR bowler = ?) AND (batting_team = ? OR bowling_team = ?)"
+    params = [player, player, opponent, opponent]
     if scope == "season" and season:
-        where += f" AND season = '{season}'"
+        where += " AND season = ?"
+        params.append(season)
 
-    df = con.execute(f"SELECT * FROM deliveries {where}").df()
-    if df.empty:
+    # Only the columns the totals below read
+    tbl = con.execute(
+        f"SELECT striker, bowler, runs_batter, runs_total, player_dismissed FROM deliveries {where}", params
+    ).to_arrow_table()
+    if tbl.num_rows == 0:
         return {"error": f"No data found for {player} vs {opponent}"}
 
-    # Batting vs Opponent Team
-    bat_df = df[df["striker"] == player]
-    bat_runs = safe_int(bat_df["runs_batter"].sum())
-    bat_balls = safe_int(len(bat_df))
-    bat_fours = safe_int((bat_df["runs_batter"] == 4).sum())
-    bat_sixes = safe_int((bat_df["runs_batter"] == 6).sum())
-    dismissals = safe_int(bat_df["player_dismissed"].notna().sum())
+    # Batting vs Opponent Team (Arrow compute kernels; sums over no rows are null, hence safe_int)
+    bat = tbl.filter(pc.equal(tbl["striker"], player))
+    bat_runs = safe_int(pc.sum(bat["runs_batter"]).as_py())
+    bat_balls = bat.num_rows
+    bat_fours = safe_int(pc.sum(pc.equal(bat["runs_batter"], 4)).as_py())
+    bat_sixes = safe_int(pc.sum(pc.equal(bat["runs_batter"], 6)).as_py())
+    dismissals = pc.count(bat["player_dismissed"]).as_py()
     sr = safe_div(bat_runs, bat_balls, 100)
     avg = safe_div(bat_runs, dismissals, 1.0)
 
@@ -591,10 +626,10 @@ def player_vs_team(db_path, player, opponent, scope="career", season=None):
     }
 
     # Bowling vs Opponent Team
-    bowl_df = df[df["bowler"] == player]
-    balls_bowled = safe_int(len(bowl_df))
-    runs_conceded = safe_int(bowl_df["runs_total"].sum())
-    wickets = safe_int(bowl_df["player_dismissed"].notna().sum())
+    bowl = tbl.filter(pc.equal(tbl["bowler"], player))
+    balls_bowled = bowl.num_rows
+    runs_conceded = safe_int(pc.sum(bowl["runs_total"]).as_py())
+    wickets = pc.count(bowl["player_dismissed"]).as_py()
     economy = safe_div(runs_conceded, balls_bowled / 6.0, 1.0)
 
     bowling_vs_team = {
@@ -611,71 +646,44 @@ def player_vs_team(db_path, player, opponent, scope="career", season=None):
     }
 
 
-def head_to_head(db_path, team_a, team_b, scope="career", season=None):
+@cached_result
+def head_to_head(db_path, team_a, team_b, scope="career", season=None, executor=None):
     """
     H2H summary + star performers for each team (bat & bowl).
     Batting star: runs, balls (legal), avg, 50s/100s (vs that opponent team).
     Bowling star: legal balls, runs conceded, econ, wickets (vs that opponent team).
     """
-    import duckdb, pandas as pd
-    con = duckdb.connect(db_path)
+    con = get_connection(db_path)
 
     
     season_filter = " AND season = ? " if (scope == "season" and season) else ""
     season_args = [season] if (scope == "season" and season) else []
 
-    # Basic H2H summary
-    base = con.execute(f"""
-        WITH h2m AS (
-          SELECT match_id, season, date, venue, team1, team2, winner
-          FROM matches_meta
-          WHERE ((team1 = ? AND team2 = ?) OR (team1 = ? AND team2 = ?))
-            {season_filter}
-        )
-        SELECT *
-        FROM h2m
-        ORDER BY date NULLS LAST, match_id
-    """, [team_a, team_b, team_b, team_a] + season_args).df()
-
-    if base.empty:
-        return {"error": f"No head-to-head matches found between {team_a} and {team_b}"
-                         + (f" in {season}" if season else "")}
-
-    matches = base["match_id"].tolist()
-
-    # Win counts
-    wins_a = int((base["winner"] == team_a).sum())
-    wins_b = int((base["winner"] == team_b).sum())
-    ties = int((base["winner"].isna()).sum()) 
-    nores = 0
-
-    earliest = base.iloc[0]
-    latest = base.iloc[-1]
-    summary = {
-        "matches": int(base.shape[0]),
-        f"wins_{team_a}": wins_a,
-        f"wins_{team_b}": wins_b,
-        "ties": ties,
-        "no_result": nores,
-        "earliest": {
-            "match_id": int(earliest["match_id"]),
-            "season": earliest.get("season"),
-            "date": str(earliest.get("date")),
-        },
-        "latest": {
-            "match_id": int(latest["match_id"]),
-            "season": latest.get("season"),
-            "date": str(latest.get("date")),
-        },
-    }
-
-    # Star performers 
-    # Batting (for team_a vs team_b): aggregate per batter only when he batted for team_a against team_b.
+    # Basic H2H summary, summed over the per-season pair table built at ingest
+    summ_job = submit_query(con, executor, f"""
+        SELECT
+          SUM(matches) AS matches,
+          SUM(wins_lo) AS wins_lo,
+          SUM(wins_hi) AS wins_hi,
+          SUM(no_winner) AS no_winner,
+          first(first_match_id ORDER BY first_date NULLS LAST, first_match_id) AS first_match_id,
+          first(season ORDER BY first_date NULLS LAST, first_match_id) AS first_season,
+          first(first_date ORDER BY first_date NULLS LAST, first_match_id) AS first_date,
+          first(last_match_id ORDER BY last_date DESC NULLS FIRST, last_match_id DESC) AS last_match_id,
+          first(season ORDER BY last_date DESC NULLS FIRST, last_match_id DESC) AS last_season,
+          first(last_date ORDER BY last_date DESC NULLS FIRST, last_match_id DESC) AS last_date
+        FROM mv_h2h_season
+        WHERE team_lo = LEAST(?, ?) AND team_hi = GREATEST(?, ?)
+          {season_filter}
+    """, [team_a, team_b, team_a, team_b] + season_args)
+
+    # Star performers (deliveries where the two sides faced each other)
+    # Batting: aggregate per batter and side, keeping the top batter for each team in the same pass.
     bat_sql = f"""
         WITH scope_delv AS (
-          SELECT *
+          SELECT match_id, innings, batting_team, bowling_team, striker, runs_batter, is_legal, player_dismissed
           FROM deliveries
-          WHERE match_id IN ({",".join(["?"]*len(matches))})
+          WHERE ((batting_team = ? AND bowling_team = ?) OR (batting_team = ? AND bowling_team = ?))
             {season_filter}
         ),
         bat AS (
@@ -684,7 +692,7 @@ def head_to_head(db_path, team_a, team_b, scope="career", season=None):
             batting_team      AS team_for,
             bowling_team      AS team_against,
             SUM(runs_batter)  AS runs,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS balls,
+            COUNT(*) FILTER (WHERE is_legal) AS balls,
             COUNT(CASE WHEN player_dismissed = striker THEN 1 END) AS outs
           FROM scope_delv
           GROUP BY striker, batting_team, bowling_team
@@ -719,19 +727,30 @@ def head_to_head(db_path, team_a, team_b, scope="career", season=None):
           LEFT JOIN milestones m
             ON (b.batter=m.batter AND b.team_for=m.team_for AND b.team_against=m.team_against)
         )
-        SELECT *
+        SELECT
+          team_for,
+          struct_pack(
+            player := batter,
+            runs := COALESCE(runs, 0)::INTEGER,
+            balls := COALESCE(balls, 0)::INTEGER,
+            avg := avg::DOUBLE,
+            fifties := fifties::INTEGER,
+            hundreds := hundreds::INTEGER
+          ) AS star
         FROM agg
-        WHERE team_for = ? AND team_against = ?
-        ORDER BY runs DESC, avg DESC NULLS LAST, sr DESC NULLS LAST, balls ASC, batter ASC
-        LIMIT 1
+        QUALIFY ROW_NUMBER() OVER (
+          PARTITION BY team_for
+          ORDER BY runs DESC, avg DESC NULLS LAST, sr DESC NULLS LAST, balls ASC, batter ASC
+        ) = 1
     """
 
-    # Bowling (for team_a vs team_b): aggregate per bowler only when he bowled for team_a against team_b.
+    # Bowling: aggregate per bowler and side, keeping the top bowler for each team in the same pass.
     bowl_sql = f"""
         WITH scope_delv AS (
-          SELECT *
+          SELECT batting_team, bowling_team, bowler, runs_total, is_legal,
+                 player_dismissed, dismissal_kind, wicket_type
           FROM deliveries
-          WHERE match_id IN ({",".join(["?"]*len(matches))})
+          WHERE ((batting_team = ? AND bowling_team = ?) OR (batting_team = ? AND bowling_team = ?))
             {season_filter}
         ),
         agg AS (
@@ -740,7 +759,7 @@ def head_to_head(db_path, team_a, team_b, scope="career", season=None):
             bowling_team      AS team_for,
             batting_team      AS team_against,
             -- legal balls bowled
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS balls,
+            COUNT(*) FILTER (WHERE is_legal) AS balls,
             SUM(runs_total)   AS runs_conceded,
             COUNT(
               CASE WHEN player_dismissed IS NOT NULL
@@ -749,65 +768,75 @@ def head_to_head(db_path, team_a, team_b, scope="career", season=None):
             ) AS wickets
           FROM scope_delv
           GROUP BY bowler, bowling_team, batting_team
+        ),
+        econ AS (
+          SELECT *, ROUND((runs_conceded * 6.0) / NULLIF(balls,0), 2) AS economy
+          FROM agg
         )
         SELECT
-          bowler, team_for, team_against,
-          balls::INTEGER AS balls,
-          runs_conceded::INTEGER AS runs_conceded,
-          wickets::INTEGER AS wickets,
-          ROUND((runs_conceded * 6.0) / NULLIF(balls,0), 2) AS economy
-        FROM agg
-        WHERE team_for = ? AND team_against = ?
-        ORDER BY wickets DESC, economy ASC NULLS LAST, runs_conceded ASC, balls DESC, bowler ASC
-        LIMIT 1
+          team_for,
+          struct_pack(
+            player := bowler,
+            balls := balls::INTEGER,
+            runs_conceded := COALESCE(runs_conceded, 0)::INTEGER,
+            wickets := wickets::INTEGER,
+            economy := economy::DOUBLE
+          ) AS star
+        FROM econ
+        QUALIFY ROW_NUMBER() OVER (
+          PARTITION BY team_for
+          ORDER BY wickets DESC, economy ASC NULLS LAST, runs_conceded ASC, balls DESC, bowler ASC
+        ) = 1
     """
 
-    # Execute stars for both teams 
-    args_common = matches + season_args
-    # A batting vs B
-    bat_a = con.execute(bat_sql, args_common + [team_a, team_b]).df()
-    # B batting vs A
-    bat_b = con.execute(bat_sql, args_common + [team_b, team_a]).df()
-    # A bowling vs B
-    bowl_a = con.execute(bowl_sql, args_common + [team_a, team_b]).df()
-    # B bowling vs A
-    bowl_b = con.execute(bowl_sql, args_common + [team_b, team_a]).df()
-
-    def bat_payload(dfrow):
-        """Get all the star performer with the bat info together"""
-        if dfrow is None:
-            return None
-        r = dfrow
-        return {
-            "player": r["batter"],
-            "runs": int(r["runs"]) if not pd.isna(r["runs"]) else 0,
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "avg": None if pd.isna(r["avg"]) else float(r["avg"]),
-            "fifties": int(r["fifties"]) if not pd.isna(r["fifties"]) else 0,
-            "hundreds": int(r["hundreds"]) if not pd.isna(r["hundreds"]) else 0,
-        }
+    # Execute stars for both teams (one row per team_for; the scope only holds A vs B and B vs A),
+    # each star already shaped as its payload dict by struct_pack.
+    # All three queries are started up front so they overlap when an executor is given.
+    args_common = [team_a, team_b, team_b, team_a] + season_args
+    bat_job = submit_query(con, executor, bat_sql, args_common)
+    bowl_job = submit_query(con, executor, bowl_sql, args_common)
 
-    def bowl_payload(dfrow):
-        """Get all the star performer with the bowl info together"""
-        if dfrow is None:
-            return None
-        r = dfrow
-        return {
-            "player": r["bowler"],
-            "balls": int(r["balls"]) if not pd.isna(r["balls"]) else 0,
-            "runs_conceded": int(r["runs_conceded"]) if not pd.isna(r["runs_conceded"]) else 0,
-            "wickets": int(r["wickets"]) if not pd.isna(r["wickets"]) else 0,
-            "economy": None if pd.isna(r["economy"]) else float(r["economy"]),
-        }
+    summ = summ_job.result().to_pylist()[0]
+    if not summ["matches"]:
+        return {"error": f"No head-to-head matches found between {team_a} and {team_b}"
+                         + (f" in {season}" if season else "")}
+
+    # Win counts
+    a_is_lo = team_a <= team_b
+    wins_a = int(summ["wins_lo"] if a_is_lo else summ["wins_hi"])
+    wins_b = int(summ["wins_hi"] if a_is_lo else summ["wins_lo"])
+    ties = int(summ["no_winner"])
+    nores = 0
+
+    summary = {
+        "matches": int(summ["matches"]),
+        f"wins_{team_a}": wins_a,
+        f"wins_{team_b}": wins_b,
+        "ties": ties,
+        "no_result": nores,
+        "earliest": {
+            "match_id": int(summ["first_match_id"]),
+            "season": summ["first_season"],
+            "date": str(summ["first_date"]),
+        },
+        "latest": {
+            "match_id": int(summ["last_match_id"]),
+            "season": summ["last_season"],
+            "date": str(summ["last_date"]),
+        },
+    }
+
+    bat_top = {r["team_for"]: r["star"] for r in bat_job.result().to_pylist()}
+    bowl_top = {r["team_for"]: r["star"] for r in bowl_job.result().to_pylist()}
 
     star = {
         team_a: {
-            "batting": bat_payload(bat_a.iloc[0] if not bat_a.empty else None),
-            "bowling": bowl_payload(bowl_a.iloc[0] if not bowl_a.empty else None),
+            "batting": bat_top.get(team_a),
+            "bowling": bowl_top.get(team_a),
         },
         team_b: {
-            "batting": bat_payload(bat_b.iloc[0] if not bat_b.empty else None),
-            "bowling": bowl_payload(bowl_b.iloc[0] if not bowl_b.empty else None),
+            "batting": bat_top.get(team_b),
+            "bowling": bowl_top.get(team_b),
         }
     }
 
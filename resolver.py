@@ -6,42 +6,33 @@
  as players mentioned in cricsheet is Initals + Last Name 
  for eg. Virat Kohli is VK Kohli 
  + wrappers around query.py
+ (db_path can be a DuckDB file path or an already-open connection/cursor)
 """
 
 import re
-import duckdb
+import threading
+from bisect import bisect_right
 from typing import Dict, Tuple, Optional, List
-import pandas as pd
 from rapidfuzz import fuzz, process
 import query as base
 
 
 # Normalization utilities
-def safe_list_col(df: pd.DataFrame, col: str):
-    """Extract non-null strings from a DataFrame column safely."""
-    if df is None or df.empty or col not in df.columns:
-        return []
-    vals: List[str] = []
-    for v in df[col].tolist():
-        if v is None or pd.isna(v):
-            continue
-        vals.append(str(v))
-    return vals
+# Dots, hyphens, zero-width joiners and non-breaking spaces all fold to a space
+_NORM_TABLE = str.maketrans({".": " ", "-": " ", "\u200d": " ", "\xa0": " "})
+_NON_ALPHA_RE = re.compile(r"[^a-zA-Z ]")
 
 def norm(s: str):
     """Normalize whitespace, punctuation, case. Can accomodate dots, hyphens etc."""
     if s is None:
         return ""
-    s = s.replace("\xa0", " ")               
-    s = re.sub(r"[.\u200d\-]", " ", s)       
-    s = re.sub(r"\s+", " ", s).strip().lower()
-    return s
+    return " ".join(s.translate(_NORM_TABLE).split()).lower()
 
 def initials_key(s: str):
     """Construct initials last key: 'Rohit Gurunath Sharma' = 'rg sharma'."""
     if s is None:
         return ""
-    s = re.sub(r"[^a-zA-Z ]", " ", s).strip()
+    s = _NON_ALPHA_RE.sub(" ", s).strip()
     parts = [p for p in s.split() if p]
     if not parts:
         return ""
@@ -51,11 +42,37 @@ def initials_key(s: str):
     last = parts[-1].lower()
     return f"{initials} {last}"
 
+def substring_index(names: List[str]) -> Tuple[str, List[int]]:
+    """Join normalized names into one newline-separated string, with each name's start offset, for substring_hits."""
+    starts, pos = [], 0
+    for n in names:
+        starts.append(pos)
+        pos += len(n) + 1
+    return "\n".join(names), starts
+
+def substring_hits(index: Tuple[str, List[int]], key: str, limit: int) -> List[int]:
+    """
+    Positions (in name order) of the first `limit` names containing key, found with str.find over the joined
+    string rather than a Python loop over every name. key never contains a newline, so hits can't straddle names.
+    """
+    blob, starts = index
+    hits: List[int] = []
+    pos = blob.find(key)
+    while pos >= 0 and len(hits) < limit:
+        i = bisect_right(starts, pos) - 1
+        hits.append(i)
+        if i + 1 >= len(starts):
+            break
+        pos = blob.find(key, starts[i + 1])
+    return hits
+
 def best_fuzzy_match(query: str, candidates: List[str], score_cutoff: int = 85):
     """Return best fuzzy match above score_cutoff (threshold)."""
     if not query or not candidates:
         return None
-    result = process.extractOne(query, candidates, scorer=fuzz.partial_ratio, score_cutoff=score_cutoff)
+    # processor=None: candidates are canonical names, don't re-process all of them on every call
+    # (RapidFuzz < 3 defaulted to default_process here, 3.x already doesn't)
+    result = process.extractOne(query, candidates, scorer=fuzz.partial_ratio, processor=None, score_cutoff=score_cutoff)
     if result:
         match, score, _ = result
         return match
@@ -98,6 +115,9 @@ PLAYER_ALIASES: Dict[str, str] = {
     "ab de villiers": "AB de Villiers",
 }
 
+# Bound on memoized resolutions per Resolver (user text is unbounded); the cache is simply reset when full
+RESOLVE_CACHE_MAX = 4096
+
 class Resolver:
     """
     Loads canonical teams/players from DuckDB and resolves user input to those.
@@ -115,43 +135,77 @@ class Resolver:
         self.by_norm_team: Dict[str, str] = {}
         self.by_norm_player: Dict[str, str] = {}
         self.by_initials_player: Dict[str, str] = {}
+        # Memoized resolve_team/resolve_player results keyed on the raw input text
+        self._team_cache: Dict[str, Optional[str]] = {}
+        self._player_cache: Dict[str, Tuple[Optional[str], Tuple[str, ...]]] = {}
         self.refresh()
 
+    @classmethod
+    def invalidate(cls, db_path: Optional[str] = None):
+        """
+        Drop the cached Resolver for db_path (or all of them), e.g. after the database was re-ingested,
+        along with query.py's cached connection and results for it.
+        """
+        with _RESOLVER_LOCK:
+            if db_path is None:
+                _RESOLVER_CACHE.clear()
+            else:
+                _RESOLVER_CACHE.pop(db_path, None)
+        base.close_connection(db_path)
+
     def refresh(self):
-        con = duckdb.connect(self.db_path)
-
-        # Teams from both columns
-        tdf = con.execute("""
-            WITH t AS (
-              SELECT team1 AS team FROM matches_meta
-              UNION ALL
-              SELECT team2 AS team FROM matches_meta
-            )
-            SELECT DISTINCT team FROM t WHERE team IS NOT NULL
-        """).df()
-        self.teams = sorted(set(safe_list_col(tdf, "team")))
-        self.by_norm_team = { norm(t): t for t in self.teams }
-
-        # Players from striker/bowler
-        pdf = con.execute("""
-            WITH p AS (
-              SELECT striker AS name FROM deliveries
-              UNION ALL
-              SELECT bowler  AS name FROM deliveries
-            )
-            SELECT DISTINCT name FROM p WHERE name IS NOT NULL
-        """).df()
-        self.players = sorted(set(safe_list_col(pdf, "name")))
-        self.by_norm_player = { norm(p): p for p in self.players }
-        self.by_initials_player = { initials_key(p): p for p in self.players }
-
-        con.close()
+        con = base.get_connection(self.db_path)
+
+        # Teams from both columns, players from striker/bowler, in one round trip
+        # (list() keeps NULLs, so they are filtered out explicitly)
+        teams, players = con.execute("""
+            SELECT
+              (SELECT list(DISTINCT team) FILTER (WHERE team IS NOT NULL) FROM (
+                 SELECT team1 AS team FROM matches_meta
+                 UNION ALL
+                 SELECT team2 AS team FROM matches_meta
+              )),
+              (SELECT list(DISTINCT name) FILTER (WHERE name IS NOT NULL) FROM (
+                 SELECT striker AS name FROM deliveries
+                 UNION ALL
+                 SELECT bowler  AS name FROM deliveries
+              ))
+        """).fetchone()
+
+        self.teams = sorted(teams or [])
+        self.by_norm_team = dict(zip(map(norm, self.teams), self.teams))
+        self._team_canon = list(self.by_norm_team.values())
+        self._team_index = substring_index(list(self.by_norm_team))
+
+        self.players = sorted(players or [])
+        # Normalize each name once and reuse it for both lookups
+        player_norms = list(map(norm, self.players))
+        self.by_norm_player = dict(zip(player_norms, self.players))
+        self.by_initials_player = dict(zip(map(initials_key, self.players), self.players))
+        self._player_index = substring_index(player_norms)
+
+        # Only close connections we opened ourselves
+        if con is not self.db_path:
+            con.close()
+
+        # Names changed, so earlier resolutions may be stale
+        self._team_cache.clear()
+        self._player_cache.clear()
 
     # Team resolution
 
     def resolve_team(self, user_text: str) -> Optional[str]:
         if not user_text:
             return None
+        if user_text in self._team_cache:
+            return self._team_cache[user_text]
+        if len(self._team_cache) >= RESOLVE_CACHE_MAX:
+            self._team_cache.clear()
+        canon = self._resolve_team(user_text)
+        self._team_cache[user_text] = canon
+        return canon
+
+    def _resolve_team(self, user_text: str) -> Optional[str]:
         key = norm(user_text)
 
         # Manual Aliases
@@ -167,10 +221,11 @@ class Resolver:
         if key in self.by_norm_team:
             return self.by_norm_team[key]
 
-        # substring / contains
-        for nk, canon in self.by_norm_team.items():
-            if key and nk.find(key) >= 0:
-                return canon
+        # substring / contains (first team in name order)
+        if key:
+            hits = substring_hits(self._team_index, key, 1)
+            if hits:
+                return self._team_canon[hits[0]]
 
         # fuzzy matching
         fuzzy = best_fuzzy_match(user_text, self.teams, score_cutoff=85)
@@ -187,7 +242,16 @@ class Resolver:
         """
         if not user_text:
             return None, []
-
+        hit = self._player_cache.get(user_text)
+        if hit is None:
+            if len(self._player_cache) >= RESOLVE_CACHE_MAX:
+                self._player_cache.clear()
+            canon, choices = self._resolve_player(user_text)
+            hit = self._player_cache[user_text] = (canon, tuple(choices))
+        # Fresh list per call so callers can't alter the cached choices
+        return hit[0], list(hit[1])
+
+    def _resolve_player(self, user_text: str) -> Tuple[Optional[str], List[str]]:
         key = norm(user_text)
 
         # Manual alias
@@ -214,12 +278,7 @@ class Resolver:
             return self.by_initials_player[ik], []
 
         # Contains/substring, may lead to ambiguous choices
-        choices: List[str] = []
-        for p in self.players:
-            if norm(p).find(key) >= 0:
-                choices.append(p)
-            if len(choices) >= 10:
-                break
+        choices = [self.players[i] for i in substring_hits(self._player_index, key, 10)]
         if len(choices) == 1:
             return choices[0], []
         if len(choices) > 1:
@@ -235,30 +294,46 @@ class Resolver:
 
 
 
+# One Resolver per database file, built on first use: loading the team/player names scans the DB
+_RESOLVER_CACHE: Dict[str, Resolver] = {}
+_RESOLVER_LOCK = threading.Lock()
+
+def _get_resolver(db_path) -> Resolver:
+    """Cached Resolver for a file path; connections/cursors get a fresh one (they don't identify the DB)."""
+    if not isinstance(db_path, str):
+        return Resolver(db_path)
+    with _RESOLVER_LOCK:
+        res = _RESOLVER_CACHE.get(db_path)
+        if res is None:
+            res = _RESOLVER_CACHE[db_path] = Resolver(db_path)
+    return res
+
+
 # Wrappers (From query.py)
+# Each accepts an already-built Resolver via res= (the API server keeps one); otherwise it uses the cached one for db_path.
 
-def match_summary(db_path: str, team_a: str, team_b: str, season: str, nth: int = 1):
-    res = Resolver(db_path)
+def match_summary(db_path: str, team_a: str, team_b: str, season: str, nth: int = 1, executor=None, res: Optional[Resolver] = None):
+    res = res or _get_resolver(db_path)
     A = res.resolve_team(team_a) or team_a
     B = res.resolve_team(team_b) or team_b
-    return base.match_summary(db_path, A, B, season, nth)
+    return base.match_summary(db_path, A, B, season, nth, executor=executor)
 
-def player_stats(db_path: str, player: str, scope: str = "career", season: Optional[str] = None):
-    res = Resolver(db_path)
+def player_stats(db_path: str, player: str, scope: str = "career", season: Optional[str] = None, executor=None, res: Optional[Resolver] = None):
+    res = res or _get_resolver(db_path)
     canonical, choices = res.resolve_player(player)
     if not canonical and choices:
         return {"error": f"Ambiguous player '{player}'", "choices": choices}
     if not canonical:
         return {"error": f"No appearances for '{player}' in current data."}
-    return base.player_stats(db_path, canonical, scope=scope, season=season)
+    return base.player_stats(db_path, canonical, scope=scope, season=season, executor=executor)
 
-def team_squad(db_path: str, team: str, season: str):
-    res = Resolver(db_path)
+def team_squad(db_path: str, team: str, season: str, res: Optional[Resolver] = None):
+    res = res or _get_resolver(db_path)
     T = res.resolve_team(team) or team
     return base.team_squad(db_path, T, season)
 
-def player_vs_team(db_path: str, player: str, opponent: str, scope: str = "career", season: Optional[str] = None):
-    res = Resolver(db_path)
+def player_vs_team(db_path: str, player: str, opponent: str, scope: str = "career", season: Optional[str] = None, res: Optional[Resolver] = None):
+    res = res or _get_resolver(db_path)
     canonical, choices = res.resolve_player(player)
     if not canonical and choices:
         return {"error": f"Ambiguous player '{player}'", "choices": choices}
@@ -267,70 +342,78 @@ def player_vs_team(db_path: str, player: str, opponent: str, scope: str = "caree
     opp = res.resolve_team(opponent) or opponent
     return base.player_vs_team(db_path, canonical, opp, scope=scope, season=season)
 
-def head_to_head(db_path: str, team_a: str, team_b: str, scope: str = "career", season: Optional[str] = None):
-    res = Resolver(db_path)
+def head_to_head(db_path: str, team_a: str, team_b: str, scope: str = "career", season: Optional[str] = None, executor=None, res: Optional[Resolver] = None):
+    res = res or _get_resolver(db_path)
     A = res.resolve_team(team_a) or team_a
     B = res.resolve_team(team_b) or team_b
-    return base.head_to_head(db_path, A, B, scope=scope, season=season)
+    return base.head_to_head(db_path, A, B, scope=scope, season=season, executor=executor)
+
+# best_phase_bowlers SQL, formatted once per WHERE shape (career / one season) at import
+_BEST_PHASE_SQL = """
+    WITH bowl AS (
+      -- per-season phase totals are pre-aggregated at ingest; career scope sums them
+      SELECT
+        bowler,
+        SUM(legal_balls) AS legal_balls,
+        SUM(runs_conceded) AS runs_conceded,
+        SUM(wickets) AS wickets,
+        SUM(matches) AS matches,
+        SUM(dots)::DOUBLE AS dots,
+        SUM(boundaries)::DOUBLE AS boundaries
+      FROM mv_phase_bowler_season
+      WHERE {where}
+      GROUP BY bowler
+      HAVING SUM(legal_balls) >= ?
+    ),
+    filt AS (
+      SELECT *,
+        (legal_balls/6) AS overs,
+        (runs_conceded * 6.0) / NULLIF(legal_balls,0) AS economy,
+        (runs_conceded / NULLIF(wickets,0)) AS average,
+        (legal_balls / NULLIF(wickets,0)) AS strike_rate,
+        (dots * 100.0) / NULLIF(legal_balls,0) AS dot_pct,
+        (boundaries * 100.0) / NULLIF(legal_balls,0) AS boundary_pct
+      FROM bowl
+    )
+    SELECT bowler,
+           CAST(overs AS DOUBLE) AS overs,
+           CAST(wickets AS INTEGER) AS wickets,
+           CAST(runs_conceded AS INTEGER) AS runs_conceded,
+           ROUND(economy, 2) AS economy,
+           ROUND(average, 2) AS average,
+           ROUND(strike_rate, 2) AS strike_rate,
+           ROUND(dot_pct, 2) AS dot_pct,
+           ROUND(boundary_pct, 2) AS boundary_pct,
+           CAST(matches AS INTEGER) AS matches
+    FROM filt
+    -- qualified so the sort uses the unrounded values, not the output aliases
+    ORDER BY filt.economy ASC NULLS LAST, filt.average ASC NULLS LAST, filt.strike_rate ASC NULLS LAST,
+             filt.overs DESC, bowler ASC
+    LIMIT 10
+"""
+_BEST_PHASE_SQL_BY_SCOPE = {
+    "career": _BEST_PHASE_SQL.format(where="phase = ?"),
+    "season": _BEST_PHASE_SQL.format(where="phase = ? AND season = ?"),
+}
 
+@base.cached_result
 def best_phase_bowlers(db_path: str, phase: str, scope: str = "career", season: Optional[str] = None, min_overs: int = 30):
     """
     Returns the best bowler of each season or entire career 
     and their stats.
-    PP: 0-6 overs, Middle Overs - 7-15 overs, Death:16-20 overs
+    PP: overs 0-5, Middle Overs - 6-14 overs, Death: 15+ (0-based Cricsheet overs)
+    Reads the per-season phase table built at ingest, so this is one small aggregation.
     """
-    con = duckdb.connect(db_path)
-    where = "phase = ?"
+    con = base.get_connection(db_path)
     params = [phase]
+    sql = _BEST_PHASE_SQL_BY_SCOPE["career"]
     if scope == "season" and season:
-        where += " AND season = ?"
+        sql = _BEST_PHASE_SQL_BY_SCOPE["season"]
         params.append(season)
 
-    df = con.execute(f"""
-        WITH bowl AS (
-          SELECT
-            bowler,
-            SUM(CASE WHEN COALESCE(wides,0)>0 OR COALESCE(noballs,0)>0 THEN 0 ELSE 1 END) AS legal_balls,
-            SUM(runs_total) AS runs_conceded,
-            COUNT(CASE WHEN player_dismissed IS NOT NULL THEN 1 END) AS wickets,
-            COUNT(DISTINCT match_id) AS matches,
-            SUM(CASE WHEN runs_total=0 AND player_dismissed IS NULL THEN 1 ELSE 0 END)::DOUBLE AS dots,
-            SUM(CASE WHEN runs_batter IN (4,6) THEN 1 ELSE 0 END)::DOUBLE AS boundaries
-          FROM deliveries
-          WHERE {where}
-          GROUP BY bowler
-        ),
-        filt AS (
-          SELECT *,
-            (legal_balls/6) AS overs,
-            (runs_conceded * 6.0) / NULLIF(legal_balls,0) AS economy,
-            (runs_conceded / NULLIF(wickets,0)) AS average,
-            (legal_balls / NULLIF(wickets,0)) AS strike_rate,
-            (dots * 100.0) / NULLIF(legal_balls,0) AS dot_pct,
-            (boundaries * 100.0) / NULLIF(legal_balls,0) AS boundary_pct
-          FROM bowl
-          WHERE legal_balls >= ?
-        ),
-        ranked AS (
-          SELECT *,
-            ROW_NUMBER() OVER (ORDER BY economy ASC NULLS LAST, average ASC NULLS LAST, strike_rate ASC NULLS LAST, overs DESC, bowler ASC) AS rk
-          FROM filt
-        )
-        SELECT bowler,
-               CAST(overs AS DOUBLE) AS overs,
-               CAST(wickets AS INTEGER) AS wickets,
-               CAST(runs_conceded AS INTEGER) AS runs_conceded,
-               ROUND(economy, 2) AS economy,
-               ROUND(average, 2) AS average,
-               ROUND(strike_rate, 2) AS strike_rate,
-               ROUND(dot_pct, 2) AS dot_pct,
-               ROUND(boundary_pct, 2) AS boundary_pct,
-               CAST(matches AS INTEGER) AS matches
-        FROM ranked
-        WHERE rk <= 10
-    """, params + [min_overs * 6]).df()
+    leaders = base.fetch_records(con.execute(sql, params + [min_overs * 6]))
 
     return {
         "input": {"phase": phase, "scope": scope, "season": season, "min_overs": min_overs},
-        "leaders": df.to_dict("records")
+        "leaders": leaders
     }
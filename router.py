@@ -1,7 +1,9 @@
 # Router.py — robust router (The most basic of LLM building block ) 
 import re
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
 # Short team tags 
 TEAM_SHORTS = {
@@ -17,11 +19,11 @@ TEAM_FULL = {t.lower() for t in [
     "Kochi Tuskers Kerala","Pune Warriors India",
 ]}
 
+@lru_cache(maxsize=512)
 def is_team_token(tok: str) :
     """Return whether the team identified in the prompt is present in the roster"""
-    u = tok.strip().upper()
-    if u in TEAM_SHORTS: return True
-    return tok.strip().lower() in TEAM_FULL
+    t = tok.strip()
+    return t.upper() in TEAM_SHORTS or t.lower() in TEAM_FULL
 
 VS_WORDS = r"(?:vs|v\.?|versus|against)"
 BETWEEN_WORDS = r"(?:between)"
@@ -30,6 +32,35 @@ SUMMARY_WORDS = r"(?:summary|recap|result|tell me about|what happened|match repo
 H2H_WORDS = r"(?:head\s*to\s*head|h2h|compare|comparison)"
 STATS_WORDS = r"(?:stats?|statistics|figures|numbers|record|profile)"
 
+# Patterns compiled once at import (route() runs several of them per query)
+_WS_RE = re.compile(r"\s+")
+_SEASON_RE = re.compile(r"\b(20\d{2})(?:/\d{2})?\b")
+_TEAM_SEASON_SUFFIX_RE = re.compile(r"\b(?:IN|FOR)\s+20\d{2}(?:/\d{2})?\b")
+_SEASON_TAIL_RE = re.compile(r"\b(?:in|for)\s+20\d{2}(?:/\d{2})?\b.*$", re.IGNORECASE)
+_ORDINAL_RE = re.compile(r"\b(\d+)(st|nd|rd|th)\b")
+_SMALL_NUM_RE = re.compile(r"\b(\d{1,2})\b")
+# Whole words: a single-word \bX\b search is the same as X being one of these tokens
+_WORD_RE = re.compile(r"\w+")
+_ORDINAL_WORDS = [("first", 1), ("second", 2), ("third", 3), ("fourth", 4), ("fifth", 5)]
+
+_PAIR_VS_RE = re.compile(rf"\b([a-z .&/]+?)\s+{VS_WORDS}\s+([a-z .&/]+?)\b", re.IGNORECASE)
+_PAIR_BETWEEN_RE = re.compile(rf"{BETWEEN_WORDS}\s+([a-z .&/]+?)\s+(?:and)\s+([a-z .&/]+?)\b", re.IGNORECASE)
+_PAIR_AND_RE = re.compile(r"\b([a-z .&/]+?)\s+(?:and)\s+([a-z .&/]+?)\b", re.IGNORECASE)
+_PLAYER_VS_RE = re.compile(rf"\b([a-z .]+?)\s+{VS_WORDS}\s+([a-z .&]+?)\b", re.IGNORECASE)
+_PLAYER_AGAINST_RE = re.compile(r"\b([a-z .]+?)\s+(?:against)\s+([a-z .&]+?)\b", re.IGNORECASE)
+_SQUAD_OF_RE = re.compile(rf"\b({SQUAD_WORDS})\s+(?:of|for)?\s*([a-z .&]+)", re.IGNORECASE)
+_TEAM_SQUAD_RE = re.compile(rf"\b([a-z .&]+)\s+{SQUAD_WORDS}\b", re.IGNORECASE)
+_STATS_OF_RE = re.compile(rf"\b{STATS_WORDS}\b.*?\b([a-z .]+)\b", re.IGNORECASE)
+_PLAYER_STATS_RE = re.compile(rf"\b([a-z .]+)\b.*?\b{STATS_WORDS}\b", re.IGNORECASE)
+
+_BEST_RE = re.compile(r"\b(best|top)\b", re.IGNORECASE)
+_BOWLERS_RE = re.compile(r"\b(bowler|bowlers)\b", re.IGNORECASE)
+_MATCH_RE = re.compile(r"\bmatch\b", re.IGNORECASE)
+_SUMMARY_RE = re.compile(SUMMARY_WORDS, re.IGNORECASE)
+_SQUAD_RE = re.compile(SQUAD_WORDS, re.IGNORECASE)
+_STATS_RE = re.compile(STATS_WORDS, re.IGNORECASE)
+_H2H_RE = re.compile(H2H_WORDS, re.IGNORECASE)
+
 INTENT_KEYWORDS = {
     "match_summary": ["summary","recap","result","what happened","match report","scorecard"],
     "team_squad":    ["squad","roster","lineup","line-up","team list","players list"],
@@ -39,6 +70,11 @@ INTENT_KEYWORDS = {
     "best_phase_bowler": ["best","top","death","powerplay","power play","middle overs","slog","end overs"],
 }
 
+# Flat keyword list for score_intent, with each intent's start offset into it
+_INTENT_NAMES = list(INTENT_KEYWORDS)
+_INTENT_KEY_STRS = [k for keys in INTENT_KEYWORDS.values() for k in keys]
+_INTENT_OFFSETS = np.cumsum([0] + [len(keys) for keys in INTENT_KEYWORDS.values()][:-1])
+
 PHASE_ALIASES = {
     "pp": "PP",
     "powerplay": "PP",
@@ -51,6 +87,9 @@ PHASE_ALIASES = {
     "slog": "Death",
     "end overs": "Death",
 }
+# (alias, regex or None when the alias is a single word and a token lookup will do, phase)
+_PHASE_PATTERNS = [(k, None if _WORD_RE.fullmatch(k) else re.compile(rf"\b{k}\b"), v)
+                   for k, v in PHASE_ALIASES.items()]
 
 # Strip leading intent words
 INTENT_PREFIX = re.compile(
@@ -60,59 +99,63 @@ INTENT_PREFIX = re.compile(
     re.IGNORECASE | re.VERBOSE,
 )
 
+# Every INTENT_PREFIX alternative starts with one of these; anything else can skip the regex
+_INTENT_PREFIX_STARTS = ("show", "tell", "give", "get", "display", "list", "compar", "head", "h2h",
+                         "v", "summary", "what", "match", "result", "scorecard")
+
+@lru_cache(maxsize=256)
 def strip_intent_prefix(q: str):
     """Strip intent words from start to lower the chance of them getting detected as players"""
+    if not q.lstrip().casefold().startswith(_INTENT_PREFIX_STARTS):
+        return " ".join(q.split())
     prev = q
     while True:
         new = INTENT_PREFIX.sub("", prev, count=1)
         if new == prev:
-            return re.sub(r"\s+", " ", new.strip())
+            return _WS_RE.sub(" ", new.strip())
         prev = new
 
 def clean_space(s: str):
     """Strip spaces from the prompt if any at start or end"""
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return " ".join((s or "").split())
 
 def normalize_team_token(tok: str):
     """Normalize the team token provided in prompt"""
-    u = re.sub(r"\s+", " ", tok.strip().upper())
-    u = re.sub(r"\b(?:IN|FOR)\s+20\d{2}(?:/\d{2})?\b", "", u).strip()
+    u = _WS_RE.sub(" ", tok.strip().upper())
+    u = _TEAM_SEASON_SUFFIX_RE.sub("", u).strip()
     # Fallback to title-case string
     return TEAM_SHORTS.get(u, tok.strip().title())
 
 def score_intent(text: str):
     """Detect intend words to identify the type of function the user wants to perform using fuzzy match"""
     t = text.lower()
-    scores = {}
-    for intent, keys in INTENT_KEYWORDS.items():
-        best = 0
-        for k in keys:
-            best = max(best, fuzz.partial_ratio(t, k))
-        scores[intent] = best
-    return scores
+    # All keywords scored in one call, then the max per intent
+    row = process.cdist([t], _INTENT_KEY_STRS, scorer=fuzz.partial_ratio, dtype=np.float64)[0]
+    return dict(zip(_INTENT_NAMES, np.maximum.reduceat(row, _INTENT_OFFSETS).tolist()))
 
 def parse_season(q: str):
     """Get the season number out of the prompt"""
-    m = re.search(r"\b(20\d{2})(?:/\d{2})?\b", q)
+    m = _SEASON_RE.search(q)
     return m.group(0) if m else None
 
 def parse_nth(q: str, default: int = 1):
     """Get the specific match out of the prompt for example first or second match between teams of the season"""
     s = q.lower()
-    ordmap = {"first":1,"second":2,"third":3,"fourth":4,"fifth":5}
-    for w,n in ordmap.items():
-        if re.search(rf"\b{w}\b", s): return n
-    m = re.search(r"\b(\d+)(st|nd|rd|th)\b", s)
+    words = set(_WORD_RE.findall(s))
+    for w, n in _ORDINAL_WORDS:
+        if w in words: return n
+    m = _ORDINAL_RE.search(s)
     if m: return int(m.group(1))
-    nums = [int(x) for x in re.findall(r"\b(\d{1,2})\b", s)]
+    nums = [int(x) for x in _SMALL_NUM_RE.findall(s)]
     small = [n for n in nums if 1 <= n <= 10]
     return small[0] if small else default
 
 def detect_phase(q: str):
     """Detect the phase for bowling""" 
     low = q.lower()
-    for k, v in PHASE_ALIASES.items():
-        if re.search(rf"\b{k}\b", low): return v
+    words = set(_WORD_RE.findall(low))
+    for k, pat, v in _PHASE_PATTERNS:
+        if (k in words) if pat is None else pat.search(low): return v
     return None
 
 # Entity Extractors 
@@ -120,22 +163,22 @@ def extract_teams_pair(q: str):
     """Accepts: 'A vs B', 'between A and B', and 'A & B' (when both look like teams)."""
     qs = strip_intent_prefix(q).replace("&", " and ")
 
-    m = re.search(rf"\b([a-z .&/]+?)\s+{VS_WORDS}\s+([a-z .&/]+?)\b", qs, re.IGNORECASE)
+    m = _PAIR_VS_RE.search(qs)
     if m:
         a, b = clean_space(m.group(1)), clean_space(m.group(2))
-        b = re.sub(r"\b(?:in|for)\s+20\d{2}(?:/\d{2})?\b.*$", "", b, flags=re.IGNORECASE).strip()
+        b = _SEASON_TAIL_RE.sub("", b).strip()
         return a, b
 
     # 'between A and B' anywhere in the string (not just at start)
-    m = re.search(rf"{BETWEEN_WORDS}\s+([a-z .&/]+?)\s+(?:and)\s+([a-z .&/]+?)\b", qs, re.IGNORECASE)
+    m = _PAIR_BETWEEN_RE.search(qs)
     if m:
         return clean_space(m.group(1)), clean_space(m.group(2))
 
     # 'A and B' without vs/between — only if both look like team tokens
-    m = re.search(rf"\b([a-z .&/]+?)\s+(?:and)\s+([a-z .&/]+?)\b", qs, re.IGNORECASE)
+    m = _PAIR_AND_RE.search(qs)
     if m:
         a, b = clean_space(m.group(1)), clean_space(m.group(2))
-        if (is_team_token(a) or a.upper() in TEAM_SHORTS) and (is_team_token(b) or b.upper() in TEAM_SHORTS):
+        if is_team_token(a) and is_team_token(b):
             return a, b
 
     return None
@@ -144,42 +187,47 @@ def extract_player_vs_team(q: str):
     """Detect if the prompt if asking for a players performance against a certain team"""
     qs = strip_intent_prefix(q).replace("&", " and ")
     
-    m = re.search(rf"\b([a-z .]+?)\s+{VS_WORDS}\s+([a-z .&]+?)\b", qs, re.IGNORECASE) \
-        or re.search(rf"\b([a-z .]+?)\s+(?:against)\s+([a-z .&]+?)\b", qs, re.IGNORECASE)
+    m = _PLAYER_VS_RE.search(qs) or _PLAYER_AGAINST_RE.search(qs)
     if not m:
         return None
     left, right = clean_space(m.group(1)), clean_space(m.group(2))
     # Heuristic: left looks like a person (not a known team) and usually has a space (first + last)
-    if not is_team_token(left) and left.upper() not in TEAM_SHORTS:
+    if not is_team_token(left):
         return left, normalize_team_token(right)
     return None
 
 def extract_team_for_squad(q: str) -> Optional[str]:
     """Detect if asking about the full squad of a IPL for a particular season"""
     qs = strip_intent_prefix(q)
-    m = re.search(rf"\b({SQUAD_WORDS})\s+(?:of|for)?\s*([a-z .&]+)", qs, re.IGNORECASE)
+    m = _SQUAD_OF_RE.search(qs)
     if m: return clean_space(m.group(2))
-    m = re.search(rf"\b([a-z .&]+)\s+{SQUAD_WORDS}\b", qs, re.IGNORECASE)
+    m = _TEAM_SQUAD_RE.search(qs)
     if m: return clean_space(m.group(1))
     return None
 
 def extract_player_for_stats(q: str) -> Optional[str]:
     qs = strip_intent_prefix(q)
-    m = re.search(rf"\b{STATS_WORDS}\b.*?\b([a-z .]+)\b", qs, re.IGNORECASE)
+    m = _STATS_OF_RE.search(qs)
     if m: return clean_space(m.group(1))
-    m = re.search(rf"\b([a-z .]+)\b.*?\b{STATS_WORDS}\b", qs, re.IGNORECASE)
+    m = _PLAYER_STATS_RE.search(qs)
     if m: return clean_space(m.group(1))
     return None
 
 # Router (This decides which function does the prompt wants the Agent to perform (Precendence order)) 
 def route(query: str) -> Dict[str, Any]:
     q = clean_space(query)
+    low = q.lower()
     season = parse_season(q)
-    nth = parse_nth(q, 1)
-    scores = score_intent(q)
+    # Fuzzy intent scores are only needed when the cheap regex/substring gates don't decide
+    scores = None
+    def _scores():
+        nonlocal scores
+        if scores is None:
+            scores = score_intent(q)
+        return scores
 
     # Phase leaderboard
-    if re.search(r"\b(best|top)\b", q, re.IGNORECASE) and re.search(r"\b(bowler|bowlers)\b", q, re.IGNORECASE):
+    if _BEST_RE.search(q) and _BOWLERS_RE.search(q):
         phase = detect_phase(q)
         if phase:
             scope = "season" if season else "career"
@@ -189,13 +237,13 @@ def route(query: str) -> Dict[str, Any]:
     pvt = extract_player_vs_team(q)
 
     # Match summary gets precedence when there are explicit summary words or match token
-    if tp and (re.search(SUMMARY_WORDS, q, re.IGNORECASE) or re.search(r"\bmatch\b", q, re.IGNORECASE)):
+    if tp and (_SUMMARY_RE.search(q) or _MATCH_RE.search(q)):
         a_raw, b_raw = tp
         return {"intent": "match_summary",
                 "params": {"team_a": normalize_team_token(a_raw),
                            "team_b": normalize_team_token(b_raw),
                            "season": season,
-                           "nth": nth}}
+                           "nth": parse_nth(low, 1)}}
 
     # Player vs Team before head-to-head 
     if pvt:
@@ -206,19 +254,19 @@ def route(query: str) -> Dict[str, Any]:
 
     # Team squad
     team_for_squad = extract_team_for_squad(q)
-    if team_for_squad and (scores["team_squad"] >= 55 or re.search(SQUAD_WORDS, q, re.IGNORECASE)):
+    if team_for_squad and (_SQUAD_RE.search(q) or _scores()["team_squad"] >= 55):
         return {"intent": "team_squad",
                 "params": {"team": normalize_team_token(team_for_squad), "season": season}}
 
     # Player stats
     player = extract_player_for_stats(q)
-    if player and (scores["player_stats"] >= 55 or re.search(STATS_WORDS, q, re.IGNORECASE)):
+    if player and (_STATS_RE.search(q) or _scores()["player_stats"] >= 55):
         return {"intent": "player_stats",
                 "params": {"player": player, "scope": "season" if season else "career", "season": season}}
 
     # Head-to-head 
-    if tp and (scores["head_to_head"] >= 40 or re.search(H2H_WORDS, q, re.IGNORECASE) or
-               " vs " in q.lower() or " between " in q.lower() or "&" in q):
+    if tp and (_H2H_RE.search(q) or " vs " in low or " between " in low or "&" in q or
+               _scores()["head_to_head"] >= 40):
         a_raw, b_raw = tp
         return {"intent": "head_to_head",
                 "params": {"team_a": normalize_team_token(a_raw),